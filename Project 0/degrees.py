@@ -9,8 +9,16 @@ https://github.com/Daychyi
 
 """
 
+import array
+import bisect
 import csv
+import heapq
+import itertools
+import multiprocessing
+import os
+import pickle
 import sys
+from collections import Counter, deque
 
 from util import Node, StackFrontier, QueueFrontier
 
@@ -23,6 +31,23 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# Maps person_ids to a dictionary of: year (an int) -> list of movie_ids,
+# so year-filtered searches only visit the matching partitions
+year_movies = {}
+
+# Sorted list of all lowercase names, for prefix search
+sorted_names = []
+
+# Maps each trigram to an array of positions in sorted_names
+name_trigrams = {}
+
+# Landmark distance index saved next to the data, see `build_landmarks`
+LANDMARK_FILE = "landmarks.pickle"
+LANDMARKS = 32
+
+# Distance stored for people a landmark cannot reach
+UNREACHABLE = 0xFFFF
+
 
 def load_data(directory):
     """
@@ -62,25 +87,105 @@ def load_data(directory):
             except KeyError:
                 pass
 
+    build_name_index()
+    build_year_index()
+
+
+def build_year_index():
+    """
+    Partitions every person's movies by year into `year_movies`.
+    Movies without a valid year are left out of the partitions.
+    """
+    year_movies.clear()
+    for person_id, person in people.items():
+        partitions = {}
+        for movie_id in person["movies"]:
+            year = movies[movie_id]["year"]
+            if year.isdigit():
+                partitions.setdefault(int(year), []).append(movie_id)
+        year_movies[person_id] = partitions
+
+
+def parse_years(text):
+    """
+    Returns the inclusive (first, last) year range for "FIRST-LAST"
+    or a single "YEAR".
+    """
+    first, _, last = text.partition("-")
+    try:
+        years = (int(first), int(last or first))
+    except ValueError:
+        raise ValueError(f"Invalid year range: {text}")
+    if years[0] > years[1]:
+        raise ValueError(f"Invalid year range: {text}")
+    return years
+
 
 def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+    usage = ("Usage: python degrees.py [directory] [--build-landmarks] "
+             "[--years FIRST-LAST]")
+    build = "--build-landmarks" in sys.argv[1:]
+    args = [arg for arg in sys.argv[1:] if arg != "--build-landmarks"]
+    years = None
+    if "--years" in args:
+        i = args.index("--years")
+        try:
+            years = parse_years(args[i + 1])
+        except (IndexError, ValueError):
+            sys.exit(usage)
+        del args[i:i + 2]
+    if len(args) > 1:
+        sys.exit(usage)
+    directory = args[0] if args else "large"
 
     # Load data from files into memory
     print("Loading data...")
     load_data(directory)
     print("Data loaded.")
 
-    source = person_id_for_name(input("Name: "))
-    if source is None:
-        sys.exit("Person not found.")
-    target = person_id_for_name(input("Name: "))
-    if target is None:
-        sys.exit("Person not found.")
-
-    path = shortest_path(source, target)
+    # Build the landmark index once, later runs load it
+    landmark_file = os.path.join(directory, LANDMARK_FILE)
+    if build:
+        save_landmarks(build_landmarks(), landmark_file)
+        print(f"Landmarks saved to {landmark_file}.")
+        return
+    landmarks = None
+    if os.path.exists(landmark_file):
+        landmarks = load_landmarks(landmark_file)
+
+    # Misspelled or partial names are offered the closest matches
+    person_ids = []
+    for _ in range(2):
+        name = input("Name: ")
+        person_id = person_id_for_name(name)
+        if person_id is None and name.lower() not in names:
+            candidates = [
+                candidate_id
+                for candidate in search_names(name)
+                for candidate_id in names[candidate]
+            ]
+            if candidates:
+                print(f"No exact match for '{name}'. Did you mean:")
+                for candidate_id in candidates:
+                    person = people[candidate_id]
+                    print(f"ID: {candidate_id}, Name: {person['name']}, "
+                          f"Birth: {person['birth']}")
+                choice = input("Intended Person ID: ")
+                if choice in candidates:
+                    person_id = choice
+        if person_id is None:
+            sys.exit("Person not found.")
+        person_ids.append(person_id)
+    source, target = person_ids
+
+    # Landmark distances cover all years, so they only serve full queries
+    if landmarks is None or years is not None:
+        path = shortest_path_by_movie(source, target, years=years)
+    else:
+        lower, upper = distance_bounds(landmarks, source, target)
+        if upper is not None:
+            print(f"Between {lower} and {upper} degrees of separation.")
+        path = shortest_path_alt(source, target, landmarks)
 
     if path is None:
         print("Not connected.")
@@ -96,16 +201,20 @@ def main():
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
-def shortest_path(source, target):
+def shortest_path(source, target, stats=None, years=None):
     """
     Returns the shortest list of (movie_id, person_id) pairs
-    that connect the source to the target.
+    that connect the source to the target, using only movies
+    released within the inclusive `years` range (first, last) if given.
 
+    If given, `stats` is filled with the number of people "explored"
+    and of (movie_id, person_id) pairs "scanned".
     If no possible path, returns None.
     """
     
-    # Keep track of number of states explored
+    # Keep track of number of states explored and neighbors scanned
     num_explored = 0
+    num_scanned = 0
 
     # Initialize frontier to just the starting position
     start = Node(state=source, parent=None, action=None)
@@ -120,6 +229,8 @@ def shortest_path(source, target):
 
         # If nothing left in frontier, then no path
         if frontier.empty():
+            if stats is not None:
+                stats.update(explored=num_explored, scanned=num_scanned)
             return None
             # raise Exception("no solution")
 
@@ -129,6 +240,8 @@ def shortest_path(source, target):
 
         # If node is the goal, then we have a solution
         if node.state == target:
+            if stats is not None:
+                stats.update(explored=num_explored, scanned=num_scanned)
             actions = []
             cells = []
             while node.parent is not None:
@@ -144,7 +257,9 @@ def shortest_path(source, target):
         explored.add(node.state)
 
         # Add neighbors to frontier
-        for action, state in neighbors_for_person(node.state):
+        neighbors = neighbors_for_person(node.state, years)
+        num_scanned += len(neighbors)
+        for action, state in neighbors:
             if not frontier.contains_state(state) and state not in explored:
                 child = Node(state=state, parent=node, action=action)
                 frontier.add(child)
@@ -153,12 +268,84 @@ def shortest_path(source, target):
     # TODO
     raise NotImplementedError
 
-def neighbors_for_person(person_id):
+
+def shortest_path_by_movie(source, target, stats=None, years=None):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, like `shortest_path`,
+    treating every movie as one hyperedge joining its whole cast:
+    a movie's stars are scanned at most once per search, however
+    many of them get expanded.
+
+    If given, only movies within the inclusive `years` range are used.
+    If given, `stats` is filled with the number of people "explored"
+    and of (movie_id, person_id) pairs "scanned".
+    If no possible path, returns None.
+    """
+    num_explored = 0
+    num_scanned = 0
+
+    # Maps each person reached to the (movie_id, person_id) reaching them
+    parent = {source: None}
+    visited_movies = set()
+    frontier = deque([source])
+    found = source == target
+
+    while frontier and not found:
+        person_id = frontier.popleft()
+        num_explored += 1
+        for movie_id in movies_for_person(person_id, years):
+            if movie_id in visited_movies:
+                continue
+            visited_movies.add(movie_id)
+            stars = movies[movie_id]["stars"]
+            num_scanned += len(stars)
+            for star in stars:
+                if star not in parent:
+                    parent[star] = (movie_id, person_id)
+                    frontier.append(star)
+                    if star == target:
+                        found = True
+            if found:
+                break
+
+    if stats is not None:
+        stats.update(explored=num_explored, scanned=num_scanned)
+    if not found:
+        return None
+
+    solution = []
+    person_id = target
+    while parent[person_id] is not None:
+        movie_id, previous = parent[person_id]
+        solution.append((movie_id, person_id))
+        person_id = previous
+    solution.reverse()
+    return solution
+
+
+def movies_for_person(person_id, years=None):
+    """
+    Returns the movie_ids of a given person, only those released
+    within the inclusive `years` range (first, last) if given.
+    """
+    if years is None:
+        return people[person_id]["movies"]
+    first, last = years
+    return [
+        movie_id
+        for year, movie_ids in year_movies[person_id].items()
+        if first <= year <= last
+        for movie_id in movie_ids
+    ]
+
+
+def neighbors_for_person(person_id, years=None):
     """
     Returns (movie_id, person_id) pairs for people
-    who starred with a given person.
+    who starred with a given person, in the `years` range if given.
     """
-    movie_ids = people[person_id]["movies"]
+    movie_ids = movies_for_person(person_id, years)
     neighbors = set()
     for movie_id in movie_ids:
         for person_id in movies[movie_id]["stars"]:
@@ -166,10 +353,201 @@ def neighbors_for_person(person_id):
     return neighbors
 
 
+def costars(person_id):
+    """
+    Returns the set of person_ids who starred with a given person.
+    """
+    return {
+        costar
+        for movie_id in people[person_id]["movies"]
+        for costar in movies[movie_id]["stars"]
+    } - {person_id}
+
+
+def bfs_distances(source, ids):
+    """
+    Returns an array of the degrees of separation from `source` to
+    every person in `ids`, UNREACHABLE for people not connected.
+    """
+    distances = {source: 0}
+    queue = deque([source])
+    while queue:
+        person_id = queue.popleft()
+        d = distances[person_id] + 1
+        for costar in costars(person_id):
+            if costar not in distances:
+                distances[costar] = d
+                queue.append(costar)
+    return array.array("H", (min(distances.get(i, UNREACHABLE), UNREACHABLE)
+                             for i in ids))
+
+
+def _landmark_distances(landmark):
+    return bfs_distances(landmark, list(people)).tobytes()
+
+
+def build_landmarks(count=LANDMARKS, processes=None):
+    """
+    Returns a landmark index: breadth-first distances from the `count`
+    people with the most co-stars to everyone else, with one search
+    per landmark run in a pool of `processes` worker processes.
+    """
+    ids = list(people)
+    landmarks = sorted(ids, key=lambda i: len(costars(i)), reverse=True)[:count]
+
+    # Workers are forked so they share the loaded data
+    if processes != 1 and "fork" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("fork")
+        with context.Pool(processes) as pool:
+            results = pool.map(_landmark_distances, landmarks)
+    else:
+        results = map(_landmark_distances, landmarks)
+
+    distances = []
+    for result in results:
+        d = array.array("H")
+        d.frombytes(result)
+        distances.append(d)
+    return {
+        "ids": ids,
+        "position": {person_id: k for k, person_id in enumerate(ids)},
+        "landmarks": landmarks,
+        "distances": distances
+    }
+
+
+def save_landmarks(index, filename):
+    """
+    Saves a landmark index to `filename`.
+    """
+    with open(filename, "wb") as f:
+        pickle.dump({
+            "ids": index["ids"],
+            "landmarks": index["landmarks"],
+            "distances": [d.tobytes() for d in index["distances"]]
+        }, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def load_landmarks(filename):
+    """
+    Loads a landmark index saved by `save_landmarks`.
+    """
+    with open(filename, "rb") as f:
+        data = pickle.load(f)
+    distances = []
+    for raw in data["distances"]:
+        d = array.array("H")
+        d.frombytes(raw)
+        distances.append(d)
+    return {
+        "ids": data["ids"],
+        "position": {person_id: k for k, person_id in enumerate(data["ids"])},
+        "landmarks": data["landmarks"],
+        "distances": distances
+    }
+
+
+def distance_bounds(index, source, target):
+    """
+    Returns (lower, upper) bounds on the degrees of separation between
+    source and target from the landmark index, by the triangle
+    inequality. Both are None if the landmarks prove they are not
+    connected; upper is None if no landmark reaches both.
+    """
+    s = index["position"][source]
+    t = index["position"][target]
+    lower = 0
+    upper = None
+    for d in index["distances"]:
+        ds, dt = d[s], d[t]
+        if (ds == UNREACHABLE) != (dt == UNREACHABLE):
+            return None, None
+        if ds == UNREACHABLE:
+            continue
+        lower = max(lower, abs(ds - dt))
+        if upper is None or ds + dt < upper:
+            upper = ds + dt
+    if source == target:
+        upper = 0
+    return lower, upper
+
+
+def shortest_path_alt(source, target, index, stats=None):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, like `shortest_path`,
+    using A* search guided by landmark lower bounds (ALT).
+
+    If given, `stats` is filled with the number of people "explored".
+    If no possible path, returns None.
+    """
+    position = index["position"]
+    columns = index["distances"]
+    goal = [d[position[target]] for d in columns]
+
+    def heuristic(person_id):
+        k = position[person_id]
+        h = 0
+        for d, g in zip(columns, goal):
+            dk = d[k]
+            if (dk == UNREACHABLE) != (g == UNREACHABLE):
+                return None
+            if dk != UNREACHABLE and abs(dk - g) > h:
+                h = abs(dk - g)
+        return h
+
+    explored = 0
+    h = heuristic(source)
+    if h is None:
+        if stats is not None:
+            stats["explored"] = explored
+        return None
+
+    cost = {source: 0}
+    parent = {source: None}
+    # Ties go to the deepest person, nearest the target
+    frontier = [(h, 0, source)]
+    closed = set()
+    while frontier:
+        f, g, person_id = heapq.heappop(frontier)
+        g = -g
+        if person_id in closed:
+            continue
+        closed.add(person_id)
+        explored += 1
+
+        # If node is the goal, then we have a solution
+        if person_id == target:
+            solution = []
+            while parent[person_id] is not None:
+                movie_id, previous = parent[person_id]
+                solution.append((movie_id, person_id))
+                person_id = previous
+            solution.reverse()
+            if stats is not None:
+                stats["explored"] = explored
+            return solution
+
+        for movie_id, neighbor in neighbors_for_person(person_id):
+            if neighbor in closed or g + 1 >= cost.get(neighbor, g + 2):
+                continue
+            h = heuristic(neighbor)
+            if h is None:
+                continue
+            cost[neighbor] = g + 1
+            parent[neighbor] = (movie_id, person_id)
+            heapq.heappush(frontier, (g + 1 + h, -g - 1, neighbor))
+
+    if stats is not None:
+        stats["explored"] = explored
+    return None
+
+
 def person_id_for_name(name):
     """
     Returns the IMDB id for a person's name,
     resolving ambiguities as needed.
+    Returns None if no one has exactly that name.
     """
     person_ids = list(names.get(name.lower(), set()))
     if len(person_ids) == 0:
@@ -192,6 +570,82 @@ def person_id_for_name(name):
         return person_ids[0]
 
 
+def trigrams(name):
+    """
+    Returns the set of three-letter substrings of a padded name.
+    """
+    padded = f"  {name} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def build_name_index():
+    """
+    Builds the sorted name list and trigram index from `names`.
+    """
+    sorted_names[:] = sorted(names)
+    postings = {}
+    for position, name in enumerate(sorted_names):
+        for gram in trigrams(name):
+            postings.setdefault(gram, []).append(position)
+    name_trigrams.clear()
+    for gram, positions in postings.items():
+        name_trigrams[gram] = array.array("i", positions)
+
+
+def names_with_prefix(prefix, limit=10):
+    """
+    Returns up to `limit` lowercase names starting with `prefix`,
+    in alphabetical order.
+    """
+    prefix = prefix.lower()
+    matches = []
+    k = bisect.bisect_left(sorted_names, prefix)
+    while k < len(sorted_names) and len(matches) < limit and \
+            sorted_names[k].startswith(prefix):
+        matches.append(sorted_names[k])
+        k += 1
+    return matches
+
+
+def search_names(query, limit=10):
+    """
+    Returns up to `limit` lowercase names matching `query`, best first:
+    the exact name, then names starting with it, then names sharing
+    the most trigrams with it, which tolerates typos.
+    """
+    query = query.lower().strip()
+    if not query:
+        return []
+    results = [query] if query in names else []
+    for name in names_with_prefix(query, limit):
+        if name not in results:
+            results.append(name)
+    if len(results) >= limit:
+        return results[:limit]
+
+    # Gather candidates from the rarest trigrams, enough that a name
+    # with a typo or two still shares one of them
+    grams = sorted(trigrams(query),
+                   key=lambda g: len(name_trigrams.get(g, ())))
+    grams = [g for g in grams if g in name_trigrams]
+    counts = Counter(itertools.chain.from_iterable(
+        name_trigrams[gram] for gram in grams[:max(1, len(grams) // 2 + 1)]
+    ))
+
+    # Rank the best candidates by trigram similarity (Dice coefficient)
+    query_grams = trigrams(query)
+    scored = []
+    for position, count in counts.most_common(limit * 5):
+        name = sorted_names[position]
+        if name in results:
+            continue
+        grams = trigrams(name)
+        score = 2 * len(grams & query_grams) / (len(grams) + len(query_grams))
+        scored.append((-score, name))
+    scored.sort()
+    results.extend(name for score, name in scored if score <= -0.3)
+    return results[:limit]
+
 
 
 if __name__ == "__main__":
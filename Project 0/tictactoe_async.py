@@ -0,0 +1,129 @@
+"""
+Project 0
+CS50's Introduction to Artificial Intelligence with Python
+https://cs50.harvard.edu/ai/2023/
+
+Attempted by
+Daychyi Ku
+https://github.com/Daychyi
+
+Non-blocking Tic Tac Toe AI: the alpha-beta search runs in a worker
+pool shared by every game on the event loop, one root move at a time,
+so callers see the best move found so far, can cancel the search when
+the human moves or resigns, and can give it a deadline.
+"""
+
+import asyncio
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import tictactoe as ttt
+
+# Worker pool shared by all searches, created on first use
+_executor = None
+
+
+def main():
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    start = time.perf_counter()
+    results = asyncio.run(play_games(games))
+    seconds = time.perf_counter() - start
+    for i, winner in enumerate(results):
+        print(f"Game {i + 1}: {winner or 'Tie'}")
+    print(f"{games} games played concurrently in {seconds:.2f}s")
+    shutdown_executor()
+
+
+async def play_games(count, timeout=None):
+    """
+    Play `count` AI-against-AI games concurrently on one event loop
+    and return the winner of each, None for a tie.
+    """
+    async def play():
+        board = ttt.initial_state()
+        while not ttt.terminal(board):
+            board = ttt.result(board, await best_move(board, timeout))
+        return ttt.winner(board)
+    return await asyncio.gather(*(play() for _ in range(count)))
+
+
+def get_executor():
+    """
+    Return the worker pool shared by all searches, creating it if needed.
+    """
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor()
+    return _executor
+
+
+def shutdown_executor():
+    """
+    Shut down the shared worker pool, cancelling searches not yet started.
+    """
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(cancel_futures=True)
+        _executor = None
+
+
+async def stream_moves(board, timeout=None, executor=None):
+    """
+    Search the board like `ttt.minimax`, yielding `(value, move)` each
+    time a better move for the current player is found.
+
+    Each root move is searched in `executor` (the shared pool if None)
+    with the alpha-beta window narrowed by the moves already searched,
+    so the last move yielded is the one `ttt.minimax` returns.
+    Stops early, keeping the moves already yielded, once `timeout`
+    seconds have passed. Cancelling the consumer stops the search after
+    the root move being searched, which cannot be interrupted.
+    """
+    if ttt.terminal(board):
+        return
+    loop = asyncio.get_running_loop()
+    executor = executor or get_executor()
+    deadline = None if timeout is None else loop.time() + timeout
+    maximizing = ttt.player(board) == ttt.X
+    search = ttt.min_alpha_beta if maximizing else ttt.max_alpha_beta
+
+    alpha, beta = -2, 2
+    value = alpha if maximizing else beta
+    for act in ttt.actions(board):
+        future = loop.run_in_executor(
+            executor, search, ttt.result(board, act), alpha, beta)
+        remaining = None if deadline is None else deadline - loop.time()
+        try:
+            score, _ = await asyncio.wait_for(future, remaining)
+        except asyncio.TimeoutError:
+            return
+        if (score > value) if maximizing else (score < value):
+            value = score
+            yield value, act
+            if maximizing:
+                alpha = max(alpha, value)
+            else:
+                beta = min(beta, value)
+
+
+async def best_move(board, timeout=None, executor=None, on_move=None):
+    """
+    Return the best move found for the current player on the board,
+    calling `on_move(value, move)` for every improvement if given.
+
+    With a `timeout` in seconds, returns the best move found by then,
+    or the first available move if no root move finished in time.
+    Returns None on a terminal board.
+    """
+    move = None
+    async for value, move in stream_moves(board, timeout, executor):
+        if on_move is not None:
+            on_move(value, move)
+    if move is None and not ttt.terminal(board):
+        move = ttt.actions(board)[0]
+    return move
+
+
+if __name__ == "__main__":
+    main()
@@ -15,6 +15,7 @@ before all mines are found.
 import itertools
 import random
 import copy
+from collections import deque
 
 
 class Minesweeper():
@@ -22,7 +23,10 @@ class Minesweeper():
     Minesweeper game representation
     """
 
-    def __init__(self, height=8, width=8, mines=8):
+    def __init__(self, height=8, width=8, mines=8, rng=None):
+
+        # Mines are placed with `rng`, the global random module if None
+        rng = rng or random
 
         # Set initial width, height, and number of mines
         self.height = height
@@ -39,8 +43,8 @@ class Minesweeper():
 
         # Add mines randomly
         while len(self.mines) != mines:
-            i = random.randrange(height)
-            j = random.randrange(width)
+            i = rng.randrange(height)
+            j = rng.randrange(width)
             if not self.board[i][j]:
                 self.mines.add((i, j))
                 self.board[i][j] = True
@@ -92,6 +96,31 @@ class Minesweeper():
 
         return count
 
+    def reveal(self, cell):
+        """
+        Returns a dictionary mapping every cell opened by clicking
+        a given safe cell to its number of nearby mines.
+
+        Cells with no nearby mines open all their neighbours as well,
+        so a click on one opens the whole empty region and its border
+        in a single breadth-first search.
+        """
+        if self.is_mine(cell):
+            raise ValueError(f"{cell} is a mine")
+        opened = {cell: self.nearby_mines(cell)}
+        queue = deque([cell])
+        while queue:
+            cell = queue.popleft()
+            if opened[cell]:
+                continue
+            for i in range(cell[0] - 1, cell[0] + 2):
+                for j in range(cell[1] - 1, cell[1] + 2):
+                    if 0 <= i < self.height and 0 <= j < self.width \
+                            and (i, j) not in opened:
+                        opened[(i, j)] = self.nearby_mines((i, j))
+                        queue.append((i, j))
+        return opened
+
     def won(self):
         """
         Checks if all mines have been flagged.
@@ -162,12 +191,15 @@ class MinesweeperAI():
     Minesweeper game player
     """
 
-    def __init__(self, height=8, width=8):
+    def __init__(self, height=8, width=8, rng=None):
 
         # Set initial height and width
         self.height = height
         self.width = width
 
+        # Random moves are drawn from `rng`, the global random module if None
+        self.rng = rng or random
+
         # Keep track of which cells have been clicked on
         self.moves_made = set()
 
@@ -223,7 +255,7 @@ class MinesweeperAI():
 
                 # Add cell to neigbour if not labelled as safe or mine
                 if (i,j) not in self.mines or self.safes:
-                    if 0<=i<8 and 0<=j<8:
+                    if 0 <= i < self.height and 0 <= j < self.width:
                         neighbour.add((i, j))
 
         return neighbour
@@ -286,6 +318,43 @@ class MinesweeperAI():
             new_knowledge.append(Sentence(new_sen,new_count))
         self.knowledge = new_knowledge
 
+    def add_knowledge_batch(self, observations):
+        """
+        Called with many (cell, count) observations at once, such as the
+        region opened by `Minesweeper.reveal`.
+
+        Adds a sentence for every observation like `add_knowledge`, but
+        marks safes and mines and updates the knowledge base only once,
+        repeating until nothing more can be concluded.
+        """
+        observations = dict(observations)
+        self.moves_made.update(observations)
+        self.safes.update(observations)
+        for cell, count in observations.items():
+            self.knowledge.append(Sentence(self.neighbour_cells(cell), count))
+        self.infer_knowledge()
+
+    def infer_knowledge(self):
+        """
+        Marks the cells of every sentence known to be all safe or
+        all mines, until no sentence gives new conclusions.
+        """
+        changed = True
+        while changed:
+            self.update_knowledge()
+            changed = False
+            knowledge = []
+            for sentence in self.knowledge:
+                if sentence.count == 0:  # mark as safe
+                    self.safes.update(sentence.cells)
+                    changed = changed or bool(sentence.cells)
+                elif len(sentence.cells) == sentence.count:  # mark as mines
+                    self.mines.update(sentence.cells)
+                    changed = True
+                else:
+                    knowledge.append(sentence)
+            self.knowledge = knowledge
+
     def make_safe_move(self):
         """
         Returns a safe cell to choose on the Minesweeper board.
@@ -312,8 +381,9 @@ class MinesweeperAI():
         
         if len(self.moves_made) < (self.height*self.width - 8): #number of mines
             random_move = self.all_moves - self.moves_made - self.mines
-            move = random.sample(random_move, 1)
-            # print(f"AI random move: {move[0]}")
-            return move[0]
+            if random_move:
+                move = self.rng.sample(sorted(random_move), 1)
+                # print(f"AI random move: {move[0]}")
+                return move[0]
         return None #No more move
         # raise NotImplementedError
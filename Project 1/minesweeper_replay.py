@@ -0,0 +1,210 @@
+"""
+Project 1
+CS50's Introduction to Artificial Intelligence with Python
+https://cs50.harvard.edu/ai/2023/
+
+Attempted by
+Daychyi Ku
+https://github.com/Daychyi
+
+Deterministic Minesweeper games: play seeded AI games, save the mine
+layout and move sequence to a compact binary log, and replay a log with
+timing hooks around the AI's phases to profile slow or lost games.
+"""
+
+import argparse
+import random
+import struct
+import time
+
+from minesweeper import Minesweeper, MinesweeperAI
+
+# Log layout: header, then the mines as (i, j) and the moves as (i, j, kind)
+MAGIC = b"MSWP"
+VERSION = 1
+HEADER = struct.Struct("<4sBQHHII")
+MINE = struct.Struct("<HH")
+MOVE = struct.Struct("<HHB")
+
+# Kinds of recorded moves
+SAFE_MOVE = 0
+RANDOM_MOVE = 1
+
+# AI methods timed during a replay, timings are inclusive of nested calls
+PHASES = ("add_knowledge", "update_knowledge", "mark_mine", "mark_safe",
+          "make_safe_move", "make_random_move")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Record and replay Minesweeper AI games.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    record = commands.add_parser("record", help="play a seeded game")
+    record.add_argument("log")
+    record.add_argument("--seed", type=int, default=0)
+    record.add_argument("--size", type=int, nargs=3, default=(8, 8, 8),
+                        metavar=("HEIGHT", "WIDTH", "MINES"))
+    replay = commands.add_parser("replay", help="replay a saved game")
+    replay.add_argument("log")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        log = play_game(*args.size, seed=args.seed)
+        save_log(log, args.log)
+        print(f"{len(log.moves)} moves, {'won' if log.won() else 'lost'}, "
+              f"saved to {args.log}")
+        return
+
+    log = load_log(args.log)
+    report = replay_game(log)
+    print(f"{len(log.moves)} moves replayed, "
+          f"{'won' if report['won'] else 'lost'}")
+    print(f"{'phase':<18} {'calls':>8} {'seconds':>10}")
+    for phase in PHASES:
+        calls, seconds = report["timings"][phase]
+        print(f"{phase:<18} {calls:>8} {seconds:>10.4f}")
+    print(f"Largest knowledge base: {max(report['knowledge'], default=0)} "
+          f"sentences")
+
+
+class GameLog():
+    """
+    Board size, mine layout and move sequence of one AI game,
+    with the seed it was played with.
+    """
+
+    def __init__(self, height, width, mines, moves=None, seed=0):
+        self.height = height
+        self.width = width
+        self.mines = set(mines)
+        self.moves = list(moves or [])
+        self.seed = seed
+
+    def game(self):
+        """
+        Returns a Minesweeper game with the logged mine layout.
+        """
+        game = Minesweeper(self.height, self.width, 0)
+        for i, j in self.mines:
+            game.mines.add((i, j))
+            game.board[i][j] = True
+        return game
+
+    def won(self):
+        """
+        Checks if no logged move hit a mine, so the AI played
+        until every safe cell was opened.
+        """
+        return not any(cell in self.mines for cell, kind in self.moves)
+
+
+def play_game(height, width, mines, seed=0):
+    """
+    Play one AI game seeded with `seed` until the AI hits a mine
+    or runs out of moves, and return its GameLog.
+    """
+    rng = random.Random(seed)
+    game = Minesweeper(height, width, mines, rng=rng)
+    ai = MinesweeperAI(height, width, rng=rng)
+    log = GameLog(height, width, game.mines, seed=seed)
+    while True:
+        move, kind = ai.make_safe_move(), SAFE_MOVE
+        if move is None:
+            move, kind = ai.make_random_move(), RANDOM_MOVE
+        if move is None:
+            return log
+        log.moves.append((move, kind))
+        if game.is_mine(move):
+            return log
+        ai.add_knowledge(move, game.nearby_mines(move))
+
+
+def save_log(log, filename):
+    """
+    Save a GameLog to `filename` in the binary log format.
+    """
+    with open(filename, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, log.seed, log.height, log.width,
+                            len(log.mines), len(log.moves)))
+        for cell in sorted(log.mines):
+            f.write(MINE.pack(*cell))
+        for (i, j), kind in log.moves:
+            f.write(MOVE.pack(i, j, kind))
+
+
+def load_log(filename):
+    """
+    Return the GameLog saved at `filename` by `save_log`.
+    """
+    with open(filename, "rb") as f:
+        data = f.read()
+    magic, version, seed, height, width, mines, moves = \
+        HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{filename} is not a Minesweeper game log")
+    offset = HEADER.size + mines * MINE.size
+    if len(data) != offset + moves * MOVE.size:
+        raise ValueError(f"{filename} is truncated")
+    mine_cells = list(MINE.iter_unpack(data[HEADER.size:offset]))
+    move_list = [((i, j), kind)
+                 for i, j, kind in MOVE.iter_unpack(data[offset:])]
+    return GameLog(height, width, mine_cells, move_list, seed)
+
+
+def time_phases(ai, hook):
+    """
+    Wrap the PHASES methods of `ai` so that every call reports
+    `hook(phase, seconds)`. Calls between the AI's own methods go
+    through the wrappers too, since they look the methods up on `ai`.
+    """
+    for phase in PHASES:
+        method = getattr(ai, phase)
+
+        def timed(*args, method=method, phase=phase):
+            start = time.perf_counter()
+            try:
+                return method(*args)
+            finally:
+                hook(phase, time.perf_counter() - start)
+        setattr(ai, phase, timed)
+
+
+def replay_game(log, hook=None):
+    """
+    Re-run the AI on the logged game, making the logged moves, and
+    return a report: "timings" maps each phase to (calls, seconds),
+    "knowledge" lists the knowledge base size after each move, and
+    "won" tells whether the game was won.
+
+    `hook(phase, seconds)` is also called for every timed call if given.
+    Move selection is timed before each move but the logged move is
+    made, so replays do not depend on the random number generator.
+    """
+    game = log.game()
+    ai = MinesweeperAI(log.height, log.width, rng=random.Random(log.seed))
+    timings = {phase: [0, 0.0] for phase in PHASES}
+
+    def record(phase, seconds):
+        timings[phase][0] += 1
+        timings[phase][1] += seconds
+        if hook is not None:
+            hook(phase, seconds)
+    time_phases(ai, record)
+
+    knowledge = []
+    for move, kind in log.moves:
+        if ai.make_safe_move() is None:
+            ai.make_random_move()
+        if game.is_mine(move):
+            break
+        ai.add_knowledge(move, game.nearby_mines(move))
+        knowledge.append(len(ai.knowledge))
+    return {
+        "timings": {phase: tuple(t) for phase, t in timings.items()},
+        "knowledge": knowledge,
+        "won": log.won()
+    }
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+"""
+Project 1
+CS50's Introduction to Artificial Intelligence with Python
+https://cs50.harvard.edu/ai/2023/
+
+Attempted by
+Daychyi Ku
+https://github.com/Daychyi
+
+Knowledge compilation for the knights and knaves puzzles: every
+knowledge base is compiled once into a reduced ordered binary decision
+diagram (BDD), after which entailment, consistency and model counting
+take time linear in the size of the diagram instead of a truth table.
+"""
+
+import time
+
+from logic import And, Biconditional, Implication, Not, Or, Symbol, \
+    model_check
+import puzzle
+
+# Terminal nodes
+FALSE = 0
+TRUE = 1
+
+
+def main():
+    symbols = [puzzle.AKnight, puzzle.AKnave, puzzle.BKnight, puzzle.BKnave,
+               puzzle.CKnight, puzzle.CKnave]
+    puzzles = [
+        ("Puzzle 0", puzzle.knowledge0),
+        ("Puzzle 1", puzzle.knowledge1),
+        ("Puzzle 2", puzzle.knowledge2),
+        ("Puzzle 3", puzzle.knowledge3)
+    ]
+    for name, knowledge in puzzles:
+        start = time.perf_counter()
+        bdd = BDD(variable_order(knowledge, symbols))
+        root = bdd.compile(knowledge)
+        compiled = time.perf_counter()
+        entailed = [symbol for symbol in symbols if bdd.entails(root, symbol)]
+        queried = time.perf_counter()
+        for symbol in symbols:
+            model_check(knowledge, symbol)
+        enumerated = time.perf_counter()
+
+        print(f"{name}: {bdd.size(root)} nodes, "
+              f"{bdd.count(root)} of {2 ** len(bdd.order)} models")
+        for symbol in entailed:
+            print(f"    {symbol}")
+        print(f"    compiled in {compiled - start:.6f}s, "
+              f"queried in {queried - compiled:.6f}s, "
+              f"model_check in {enumerated - queried:.6f}s")
+
+
+def variable_order(sentence, symbols=()):
+    """
+    Return the symbols of `sentence` in the order a depth-first walk
+    first meets them, followed by any other `symbols`. Symbols mentioned
+    together, such as one person's knight and knave symbols, end up
+    next to each other, which keeps the diagram small.
+    """
+    order = []
+    seen = set()
+    stack = [sentence]
+    while stack:
+        s = stack.pop()
+        if isinstance(s, Symbol):
+            if s.name not in seen:
+                seen.add(s.name)
+                order.append(s)
+        elif isinstance(s, Not):
+            stack.append(s.operand)
+        elif isinstance(s, And):
+            stack.extend(reversed(s.conjuncts))
+        elif isinstance(s, Or):
+            stack.extend(reversed(s.disjuncts))
+        elif isinstance(s, Implication):
+            stack.extend((s.consequent, s.antecedent))
+        elif isinstance(s, Biconditional):
+            stack.extend((s.right, s.left))
+        else:
+            raise TypeError(f"Unknown sentence: {s}")
+    for symbol in symbols:
+        if symbol.name not in seen:
+            seen.add(symbol.name)
+            order.append(symbol)
+    return order
+
+
+class BDD():
+    """
+    Reduced ordered binary decision diagrams over the symbols in `order`,
+    all sharing one node table. A diagram is a node id: FALSE, TRUE, or
+    an index into `nodes`, whose entries are (level, low, high) with
+    low and high the diagrams for the symbol at `level` false and true.
+    """
+
+    def __init__(self, order):
+        self.order = list(order)
+        self.level = {symbol.name: i for i, symbol in enumerate(self.order)}
+        terminal = len(self.order)
+        self.nodes = [(terminal, None, None), (terminal, None, None)]
+        self.unique = {}
+        self.cache = {}
+
+    def node(self, level, low, high):
+        """
+        Return the node testing the symbol at `level`, sharing it
+        with any identical node and skipping redundant tests.
+        """
+        if low == high:
+            return low
+        key = (level, low, high)
+        u = self.unique.get(key)
+        if u is None:
+            u = len(self.nodes)
+            self.nodes.append(key)
+            self.unique[key] = u
+        return u
+
+    def var(self, symbol):
+        """
+        Return the diagram of a single symbol.
+        """
+        if symbol.name not in self.level:
+            raise ValueError(f"{symbol} is not in the variable order")
+        return self.node(self.level[symbol.name], FALSE, TRUE)
+
+    def negate(self, u):
+        """
+        Return the diagram of not `u`.
+        """
+        return self.apply("xor", u, TRUE)
+
+    def apply(self, op, u, v):
+        """
+        Return the diagram of `u op v` for op "and", "or", "xor",
+        "implies" or "iff", memoized over pairs of nodes.
+        """
+        if u <= TRUE and v <= TRUE:
+            return int(OPERATORS[op](u, v))
+        if op != "implies" and u > v:
+            u, v = v, u
+        key = (op, u, v)
+        result = self.cache.get(key)
+        if result is not None:
+            return result
+        level_u, low_u, high_u = self.nodes[u]
+        level_v, low_v, high_v = self.nodes[v]
+        level = min(level_u, level_v)
+        if level_u != level:
+            low_u = high_u = u
+        if level_v != level:
+            low_v = high_v = v
+        result = self.node(level, self.apply(op, low_u, low_v),
+                           self.apply(op, high_u, high_v))
+        self.cache[key] = result
+        return result
+
+    def compile(self, sentence):
+        """
+        Return the diagram of a `logic` sentence.
+        """
+        if isinstance(sentence, Symbol):
+            return self.var(sentence)
+        if isinstance(sentence, Not):
+            return self.negate(self.compile(sentence.operand))
+        if isinstance(sentence, And):
+            u = TRUE
+            for conjunct in sentence.conjuncts:
+                u = self.apply("and", u, self.compile(conjunct))
+            return u
+        if isinstance(sentence, Or):
+            u = FALSE
+            for disjunct in sentence.disjuncts:
+                u = self.apply("or", u, self.compile(disjunct))
+            return u
+        if isinstance(sentence, Implication):
+            return self.apply("implies", self.compile(sentence.antecedent),
+                              self.compile(sentence.consequent))
+        if isinstance(sentence, Biconditional):
+            return self.apply("iff", self.compile(sentence.left),
+                              self.compile(sentence.right))
+        raise TypeError(f"Unknown sentence: {sentence}")
+
+    def restrict(self, u, symbol, value):
+        """
+        Return the diagram of `u` with `symbol` fixed to `value`.
+        """
+        target = self.level[symbol.name]
+        memo = {}
+
+        def walk(u):
+            level, low, high = self.nodes[u]
+            if level > target:
+                return u
+            if level == target:
+                return high if value else low
+            if u not in memo:
+                memo[u] = self.node(level, walk(low), walk(high))
+            return memo[u]
+        return walk(u)
+
+    def consistent(self, u):
+        """
+        Checks if the knowledge `u` has at least one model.
+        """
+        return u != FALSE
+
+    def entails(self, u, query):
+        """
+        Checks if the knowledge `u` entails `query`, a sentence:
+        for a symbol, if `u` has no model with the symbol false.
+        """
+        if isinstance(query, Symbol):
+            return self.restrict(u, query, False) == FALSE
+        return self.apply("and", u, self.negate(self.compile(query))) == FALSE
+
+    def count(self, u):
+        """
+        Return the number of models of `u` over every symbol in the order.
+        """
+        memo = {FALSE: 0, TRUE: 1}
+
+        def walk(u):
+            if u not in memo:
+                level, low, high = self.nodes[u]
+                memo[u] = (
+                    walk(low) * 2 ** (self.nodes[low][0] - level - 1) +
+                    walk(high) * 2 ** (self.nodes[high][0] - level - 1)
+                )
+            return memo[u]
+        return walk(u) * 2 ** self.nodes[u][0]
+
+    def size(self, u):
+        """
+        Return the number of nodes reachable from `u`, terminals included.
+        """
+        seen = {u}
+        stack = [u]
+        while stack:
+            level, low, high = self.nodes[stack.pop()]
+            for child in (low, high):
+                if child is not None and child not in seen:
+                    seen.add(child)
+                    stack.append(child)
+        return len(seen)
+
+
+# Truth tables of the operators of `BDD.apply` on terminal nodes
+OPERATORS = {
+    "and": lambda a, b: a and b,
+    "or": lambda a, b: a or b,
+    "xor": lambda a, b: a != b,
+    "implies": lambda a, b: (not a) or b,
+    "iff": lambda a, b: a == b
+}
+
+
+if __name__ == "__main__":
+    main()
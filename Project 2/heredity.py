@@ -9,8 +9,11 @@ https://github.com/Daychyi
 
 """
 
+import array
 import csv
 import itertools
+import math
+import random
 import sys
 
 PROBS = {
@@ -47,13 +50,80 @@ PROBS = {
     "mutation": 0.01
 }
 
+# Sampling stops once every standard error is at most this
+TOLERANCE = 0.005
+
+# Sampling methods of `iterate_samples`
+METHODS = ("weighting", "gibbs")
+
 
 def main():
 
     # Check for proper usage
-    if len(sys.argv) != 2:
-        sys.exit("Usage: python heredity.py data.csv")
-    people = load_data(sys.argv[1])
+    usage = ("Usage: python heredity.py data.csv "
+             "[samples [weighting|gibbs [seed [tolerance]]]]")
+    if len(sys.argv) not in (2, 3, 4, 5, 6):
+        sys.exit(usage)
+    try:
+        pedigree = load_pedigree(sys.argv[1])
+    except ValueError as e:
+        sys.exit(str(e))
+
+    # Approximate inference when a sample count is given
+    sampling = len(sys.argv) > 2
+    if sampling:
+        try:
+            samples = int(sys.argv[2])
+            method = sys.argv[3] if len(sys.argv) > 3 else "weighting"
+            seed = int(sys.argv[4]) if len(sys.argv) > 4 else None
+            tolerance = float(sys.argv[5]) if len(sys.argv) > 5 \
+                else TOLERANCE
+        except ValueError:
+            sys.exit(usage)
+        if samples < 1:
+            sys.exit("Sample count must be at least 1")
+        if method not in METHODS:
+            sys.exit(f"Unknown sampling method: {method}")
+
+    # Infer each independent family separately
+    probabilities = {}
+    errors = {}
+    for family in pedigree.families():
+        people = pedigree.people(family)
+        if sampling:
+            p, e, n = sample_probabilities(
+                people, samples, method=method, seed=seed, tolerance=tolerance,
+                report=lambda n, p, e: print(
+                    f"{n} samples, max standard error {max_error(e):.4f}",
+                    file=sys.stderr
+                )
+            )
+            probabilities.update(p)
+            errors.update(e)
+        else:
+            probabilities.update(exact_probabilities(people))
+
+    # Print results
+    if sampling:
+        print(f"Approximate inference ({method})")
+    for person in pedigree.rows():
+        print(f"{person}:")
+        for field in probabilities[person]:
+            print(f"  {field.capitalize()}:")
+            for value in probabilities[person][field]:
+                p = probabilities[person][field][value]
+                if sampling:
+                    e = errors[person][field][value]
+                    print(f"    {value}: {p:.4f} +/- {e:.4f}")
+                else:
+                    print(f"    {value}: {p:.4f}")
+
+
+def exact_probabilities(people):
+    """
+    Return the exact gene and trait distributions of everyone in
+    `people`, by enumerating every gene and trait assignment.
+    """
 
     # Keep track of gene and trait probabilities for each person
     probabilities = {
@@ -94,15 +164,7 @@ def main():
     
     # Ensure probabilities sum to 1
     normalize(probabilities)
-
-    # Print results
-    for person in people:
-        print(f"{person}:")
-        for field in probabilities[person]:
-            print(f"  {field.capitalize()}:")
-            for value in probabilities[person][field]:
-                p = probabilities[person][field][value]
-                print(f"    {value}: {p:.4f}")
+    return probabilities
 
 
 def load_data(filename):
@@ -111,20 +173,175 @@ def load_data(filename):
     File assumed to be a CSV containing fields name, mother, father, trait.
     mother, father must both be blank, or both be valid names in the CSV.
     trait should be 0 or 1 if trait is known, blank otherwise.
+    Raises ValueError if the file breaks any of those assumptions.
     """
-    data = dict()
-    with open(filename) as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            name = row["name"]
+    pedigree = load_pedigree(filename)
+    return pedigree.people(pedigree.rows(ids=True))
+
+
+class Pedigree():
+    """
+    Compact pedigree representation for large family datasets.
+    Every name is interned to an integer id; parents and traits are
+    kept in arrays indexed by id, with -1 for no parent or unknown trait.
+    """
+
+    def __init__(self):
+        self.names = []
+        self.ids = {}
+        self.mother = array.array("i")
+        self.father = array.array("i")
+        self.trait = array.array("b")
+
+        # Whether each id has its own row, and ids in row order
+        self.defined = bytearray()
+        self.order = array.array("i")
+
+    def intern(self, name):
+        """
+        Return the id of `name`, allocating a new one if needed.
+        """
+        i = self.ids.get(name)
+        if i is None:
+            i = len(self.names)
+            self.ids[name] = i
+            self.names.append(name)
+            self.mother.append(-1)
+            self.father.append(-1)
+            self.trait.append(-1)
+            self.defined.append(0)
+        return i
+
+    def add(self, name, mother, father, trait):
+        """
+        Add the row of one person. `mother` and `father` are names or
+        None, `trait` is True, False or None. Parents may be added later.
+        """
+        if not name:
+            raise ValueError("Row without a name")
+        if (mother is None) != (father is None):
+            raise ValueError(f"{name}: mother and father must both be "
+                             "blank or both be given")
+        i = self.intern(name)
+        if self.defined[i]:
+            raise ValueError(f"{name}: duplicate row")
+        self.defined[i] = 1
+        self.order.append(i)
+        if mother is not None:
+            self.mother[i] = self.intern(mother)
+            self.father[i] = self.intern(father)
+        self.trait[i] = -1 if trait is None else int(trait)
+
+    def validate(self):
+        """
+        Raise ValueError if any parent has no row of their own, or if
+        anyone is their own ancestor.
+        """
+        dangling = [self.names[i] for i in range(len(self.names))
+                    if not self.defined[i]]
+        if dangling:
+            raise ValueError(f"Parents without a row: {', '.join(dangling)}")
+
+        # Kahn's algorithm: whoever is never freed lies on a cycle
+        n = len(self.names)
+        children = [0] * n
+        pending = [0] * n
+        for i in range(n):
+            for parent in {self.mother[i], self.father[i]} - {-1}:
+                pending[i] += 1
+                children[parent] += 1
+        start = [0] * (n + 1)
+        for i in range(n):
+            start[i + 1] = start[i] + children[i]
+        child_ids = array.array("i", bytes(4 * start[n]))
+        fill = start[:n]
+        for i in range(n):
+            for parent in {self.mother[i], self.father[i]} - {-1}:
+                child_ids[fill[parent]] = i
+                fill[parent] += 1
+
+        queue = [i for i in range(n) if pending[i] == 0]
+        freed = 0
+        while queue:
+            i = queue.pop()
+            freed += 1
+            for k in range(start[i], start[i + 1]):
+                child = child_ids[k]
+                pending[child] -= 1
+                if pending[child] == 0:
+                    queue.append(child)
+        if freed != n:
+            cycle = [self.names[i] for i in range(n) if pending[i]]
+            raise ValueError(f"Ancestry cycle among: {', '.join(cycle)}")
+
+    def families(self):
+        """
+        Return a list of families, each a list of ids in row order,
+        such that no one is related to anyone outside their family.
+        """
+        root = list(range(len(self.names)))
+
+        def find(i):
+            while root[i] != i:
+                root[i] = root[root[i]]
+                i = root[i]
+            return i
+
+        for i in range(len(self.names)):
+            for parent in (self.mother[i], self.father[i]):
+                if parent != -1:
+                    a, b = find(i), find(parent)
+                    if a != b:
+                        root[a] = b
+
+        families = {}
+        for i in self.order:
+            families.setdefault(find(i), []).append(i)
+        return list(families.values())
+
+    def rows(self, ids=False):
+        """
+        Return everyone's names (or ids) in the order of their rows.
+        """
+        if ids:
+            return list(self.order)
+        return [self.names[i] for i in self.order]
+
+    def people(self, ids):
+        """
+        Return the people with the given ids as the dictionary of
+        name, mother, father and trait used by the inference functions.
+        """
+        data = dict()
+        for i in ids:
+            name = self.names[i]
             data[name] = {
                 "name": name,
-                "mother": row["mother"] or None,
-                "father": row["father"] or None,
-                "trait": (True if row["trait"] == "1" else
-                          False if row["trait"] == "0" else None)
+                "mother": (self.names[self.mother[i]]
+                           if self.mother[i] != -1 else None),
+                "father": (self.names[self.father[i]]
+                           if self.father[i] != -1 else None),
+                "trait": None if self.trait[i] == -1 else bool(self.trait[i])
             }
-    return data
+        return data
+
+
+def load_pedigree(filename):
+    """
+    Stream a CSV with fields name, mother, father, trait into a Pedigree,
+    one row at a time. Raises ValueError on malformed rows, dangling
+    parents or ancestry cycles.
+    """
+    pedigree = Pedigree()
+    with open(filename) as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            trait = (True if row["trait"] == "1" else
+                     False if row["trait"] == "0" else None)
+            pedigree.add(row["name"], row["mother"] or None,
+                         row["father"] or None, trait)
+    pedigree.validate()
+    return pedigree
 
 
 def powerset(s):
@@ -139,6 +356,53 @@ def powerset(s):
     ]
 
 
+def compile_model(probs):
+    """
+    Precompile `probs` into lookup tables indexed by small integers:
+        * "founder"[g]: probability of a person without parents
+          having g copies of the gene,
+        * "inherit"[g][m][f]: probability of a child having g copies
+          given m copies in the mother and f copies in the father,
+        * "trait"[g][t]: probability of trait t (0 or 1) given g copies,
+    plus "log_trait" holding the logs of "trait".
+    """
+    passing = [probs["mutation"], 0.5, 1 - probs["mutation"]]
+    founder = [probs["gene"][g] for g in range(3)]
+    inherit = [[[0.0] * 3 for m in range(3)] for g in range(3)]
+    for m in range(3):
+        for f in range(3):
+            inherit[0][m][f] = (1 - passing[m]) * (1 - passing[f])
+            inherit[1][m][f] = passing[m] * (1 - passing[f]) + \
+                (1 - passing[m]) * passing[f]
+            inherit[2][m][f] = passing[m] * passing[f]
+    trait = [[probs["trait"][g][False], probs["trait"][g][True]]
+             for g in range(3)]
+
+    def log(p):
+        return math.log(p) if p > 0 else -math.inf
+
+    return {
+        "founder": founder,
+        "inherit": inherit,
+        "trait": trait,
+        "log_trait": [[log(p) for p in row] for row in trait]
+    }
+
+
+# Lookup tables compiled once from PROBS
+MODEL = compile_model(PROBS)
+
+
+def gene_counts(people, one_gene, two_genes):
+    """
+    Return a dictionary mapping every person to their gene count.
+    """
+    return {
+        person: 2 if person in two_genes else 1 if person in one_gene else 0
+        for person in people
+    }
+
+
 def joint_probability(people, one_gene, two_genes, have_trait):
     """
     Compute and return a joint probability.
@@ -150,59 +414,20 @@ def joint_probability(people, one_gene, two_genes, have_trait):
         * everyone in set `have_trait` has the trait, and
         * everyone not in set` have_trait` does not have the trait.
     """
-    # print(f"2:{two_genes},\t 1:{one_gene},\t trait:{have_trait}")
-    p = 1.0
+    genes = gene_counts(people, one_gene, two_genes)
+    founder = MODEL["founder"]
+    inherit = MODEL["inherit"]
+    trait = MODEL["trait"]
 
-    for person in people:
-        gene_count = 0
-        trait_status = False
-        if person in have_trait: 
-            trait_status = True
-        if person in two_genes: #person has 2 gene 
-            gene_count = 2
-        elif person in one_gene: #person has 1 gene 
-            gene_count = 1
-
-        p *= person_prob(people, person, one_gene, two_genes, gene_count)
-        p *= PROBS['trait'][gene_count][trait_status]
-
-        # print(f"joint_probability: {p}")
+    p = 1.0
+    for person, gene_count in genes.items():
+        mom = people[person]["mother"]
+        if mom is None: #without parent
+            p *= founder[gene_count]
+        else: # get genes from parents
+            p *= inherit[gene_count][genes[mom]][genes[people[person]["father"]]]
+        p *= trait[gene_count][person in have_trait]
     return p
-    # raise NotImplementedError
-
-def person_prob(people, person, one_gene, two_genes, gene_count):
-    """ return probability of a person with gene_count"""
-    
-    mom = people[person]['mother']
-    dad = people[person]['father']
-
-    if mom is None: #without parent
-        return PROBS["gene"][gene_count]
-
-    else: # get genes from parents
-        gene_from_dad = gene_from_parent_prob(dad,one_gene,two_genes)#1 gene from dad
-        gene_from_mom = gene_from_parent_prob(mom,one_gene,two_genes)#1 gene from mom
-
-        match gene_count: 
-            case 2: # the person has 2 gene
-                return gene_from_dad * gene_from_mom
-
-            case 1: # the person has 1 gene
-                return gene_from_mom * (1 - gene_from_dad ) + \
-                      ( 1 - gene_from_mom ) * gene_from_dad
-                
-            case _: # the person has 0 gene
-                return (1 - gene_from_mom) * (1 - gene_from_dad)
-    
-    
-def gene_from_parent_prob(parent, one_gene, two_genes):
-    """ return the probability of a person getting 1 gene from a parent"""
-    if parent in two_genes: # parent has 2 gene
-        return (1 - PROBS["mutation"])
-    elif parent in one_gene: # parent has 1 gene
-        return 0.5
-    else: # parent has 0 gene
-        return PROBS["mutation"]
 
 
 def update(probabilities, one_gene, two_genes, have_trait, p):
@@ -246,5 +471,278 @@ def normalize(probabilities):
     # raise NotImplementedError
 
 
+def topological_order(people):
+    """
+    Return a list of the names in `people` ordered so that
+    every parent appears before any of their children.
+    """
+    order = []
+    visited = set()
+    for name in people:
+        stack = [(name, False)]
+        while stack:
+            person, expanded = stack.pop()
+            if expanded:
+                order.append(person)
+                continue
+            if person in visited:
+                continue
+            visited.add(person)
+            stack.append((person, True))
+            for parent in (people[person]["mother"], people[person]["father"]):
+                if parent is not None and parent not in visited:
+                    stack.append((parent, False))
+    return order
+
+
+def gene_distribution(people, person, genes):
+    """
+    Return a list of probabilities of `person` having 0, 1 and 2 copies
+    of the gene, given the gene counts already assigned in `genes`.
+    """
+    mom = people[person]["mother"]
+    if mom is None:
+        return list(MODEL["founder"])
+    m = genes[mom]
+    f = genes[people[person]["father"]]
+    inherit = MODEL["inherit"]
+    return [inherit[0][m][f], inherit[1][m][f], inherit[2][m][f]]
+
+
+def empty_probabilities(people):
+    """
+    Return a nested gene and trait dictionary of zeros for every person.
+    """
+    return {
+        person: {
+            "gene": {2: 0, 1: 0, 0: 0},
+            "trait": {True: 0, False: 0}
+        }
+        for person in people
+    }
+
+
+def max_error(errors):
+    """
+    Return the largest standard error over every person and value.
+    """
+    return max(
+        (e for person in errors for field in errors[person]
+         for e in errors[person][field].values()),
+        default=0
+    )
+
+
+def iterate_samples(people, method="weighting", seed=None,
+                    batch=1000, burn_in=1000, samples=None):
+    """
+    Sample the gene and trait variables of `people`, yielding
+    `(n, probabilities, errors)` after every `batch` samples, where
+    `probabilities` holds the running marginal estimates and `errors`
+    their standard errors in the same layout. Sampling goes on forever,
+    or stops after exactly `samples` samples if given, the last batch
+    being cut short as needed.
+
+    `method` is "weighting" for likelihood weighting, or "gibbs" for
+    Gibbs sampling conditioned on the observed traits. Memory use only
+    depends on the number of people, never on the number of samples.
+    """
+    rng = random.Random(seed)
+    order = topological_order(people)
+    if method == "weighting":
+        yield from _weighting_samples(people, order, rng, batch, samples)
+    elif method == "gibbs":
+        yield from _gibbs_samples(people, order, rng, batch, burn_in,
+                                  samples)
+    else:
+        raise ValueError(f"Unknown sampling method: {method}")
+
+
+def sample_probabilities(people, samples, method="weighting", seed=None,
+                         tolerance=None, batch=1000, report=None):
+    """
+    Estimate gene and trait probabilities from at most `samples` samples.
+
+    Sampling stops early once every standard error is at most
+    `tolerance`. `report`, if given, is called with the running
+    `(n, probabilities, errors)` after every batch.
+    Return a tuple `(probabilities, errors, n)`.
+    Raises ValueError if `samples` is below 1 or `method` is unknown.
+    """
+    if samples < 1:
+        raise ValueError(f"Sample count must be at least 1: {samples}")
+    if method not in METHODS:
+        raise ValueError(f"Unknown sampling method: {method}")
+    batch = max(1, min(batch, samples))
+    probabilities, errors, n = empty_probabilities(people), None, 0
+    for n, probabilities, errors in iterate_samples(
+            people, method=method, seed=seed, batch=batch, samples=samples):
+        if report is not None:
+            report(n, probabilities, errors)
+        if tolerance is not None and max_error(errors) <= tolerance:
+            break
+    return probabilities, errors, n
+
+
+def _weighting_samples(people, order, rng, batch, samples=None):
+    """
+    Likelihood weighting: genes and unknown traits are sampled forward,
+    known traits weight the sample by their likelihood.
+    Log-weights are rescaled against the largest one seen so far so
+    long pedigrees full of evidence do not underflow.
+    Standard errors are reported as 1 until there are two samples.
+    """
+    # Per person: weighted sums of [gene 0, gene 1, gene 2, no trait, trait]
+    sum_wx = {person: [0.0] * 5 for person in people}
+    sum_w2x = {person: [0.0] * 5 for person in people}
+    sum_w = sum_w2 = 0.0
+    shift = None
+    n = 0
+
+    while n != samples:
+        genes = {}
+        log_w = 0.0
+        sample = {}
+        for person in order:
+            gene_count = rng.choices((0, 1, 2),
+                                     gene_distribution(people, person, genes))[0]
+            genes[person] = gene_count
+            trait = people[person]["trait"]
+            if trait is None:
+                trait = rng.random() < MODEL["trait"][gene_count][1]
+            else:
+                log_w += MODEL["log_trait"][gene_count][trait]
+            sample[person] = (gene_count, 4 if trait else 3)
+
+        # Rescale accumulators whenever a new largest weight appears
+        if shift is None or log_w > shift:
+            if shift is not None:
+                scale = math.exp(shift - log_w)
+                sum_w *= scale
+                sum_w2 *= scale * scale
+                for person in people:
+                    sum_wx[person] = [v * scale for v in sum_wx[person]]
+                    sum_w2x[person] = [v * scale * scale
+                                       for v in sum_w2x[person]]
+            shift = log_w
+        w = math.exp(log_w - shift)
+
+        sum_w += w
+        sum_w2 += w * w
+        for person, indices in sample.items():
+            for i in indices:
+                sum_wx[person][i] += w
+                sum_w2x[person][i] += w * w
+        n += 1
+
+        if n % batch == 0 or n == samples:
+            estimates = {}
+            errors = {}
+            for person in people:
+                p = [v / sum_w for v in sum_wx[person]]
+                if n > 1:
+                    e = [
+                        math.sqrt(max(0.0, (1 - 2 * p[i]) *
+                                      sum_w2x[person][i] +
+                                      p[i] * p[i] * sum_w2)) / sum_w
+                        for i in range(5)
+                    ]
+                else:
+                    e = [1.0] * 5
+                estimates[person] = _as_probabilities(p)
+                errors[person] = _as_probabilities(e)
+            yield n, estimates, errors
+
+
+def _gibbs_samples(people, order, rng, batch, burn_in, samples=None):
+    """
+    Gibbs sampling: each gene is resampled from its Markov blanket
+    (parents, own trait and children), each unknown trait from its gene.
+    Standard errors come from batch means, one batch per yield,
+    each batch weighted by its size.
+    """
+    children = {person: [] for person in people}
+    for person in people:
+        for parent in (people[person]["mother"], people[person]["father"]):
+            if parent is not None and person not in children[parent]:
+                children[parent].append(person)
+
+    # Start from a forward sample consistent with the evidence
+    genes = {}
+    traits = {}
+    for person in order:
+        genes[person] = rng.choices((0, 1, 2),
+                                    gene_distribution(people, person, genes))[0]
+        trait = people[person]["trait"]
+        traits[person] = (rng.random() < MODEL["trait"][genes[person]][1]
+                          if trait is None else trait)
+
+    def sweep():
+        for person in order:
+            weights = gene_distribution(people, person, genes)
+            for gene_count in (0, 1, 2):
+                genes[person] = gene_count
+                w = weights[gene_count] * \
+                    MODEL["trait"][gene_count][traits[person]]
+                for child in children[person]:
+                    w *= gene_distribution(people, child, genes)[genes[child]]
+                weights[gene_count] = w
+            genes[person] = rng.choices((0, 1, 2), weights)[0]
+            if people[person]["trait"] is None:
+                traits[person] = \
+                    rng.random() < MODEL["trait"][genes[person]][1]
+
+    for _ in range(burn_in):
+        sweep()
+
+    # Per person: size-weighted sums of batch means and squared means
+    sum_means = {person: [0.0] * 5 for person in people}
+    sum_means2 = {person: [0.0] * 5 for person in people}
+    batches = 0
+    n = 0
+
+    while n != samples:
+        size = batch if samples is None else min(batch, samples - n)
+        counts = {person: [0] * 5 for person in people}
+        for _ in range(size):
+            sweep()
+            for person in people:
+                counts[person][genes[person]] += 1
+                counts[person][4 if traits[person] else 3] += 1
+        n += size
+        batches += 1
+
+        estimates = {}
+        errors = {}
+        for person in people:
+            for i in range(5):
+                mean = counts[person][i] / size
+                sum_means[person][i] += size * mean
+                sum_means2[person][i] += size * mean * mean
+            p = [v / n for v in sum_means[person]]
+            if batches > 1:
+                e = [
+                    math.sqrt(max(0.0, sum_means2[person][i] / n -
+                                  p[i] * p[i]) / (batches - 1))
+                    for i in range(5)
+                ]
+            else:
+                e = [1.0] * 5
+            estimates[person] = _as_probabilities(p)
+            errors[person] = _as_probabilities(e)
+        yield n, estimates, errors
+
+
+def _as_probabilities(values):
+    """
+    Convert [gene 0, gene 1, gene 2, no trait, trait] into the
+    nested gene and trait dictionary used by `main`.
+    """
+    return {
+        "gene": {2: values[2], 1: values[1], 0: values[0]},
+        "trait": {True: values[4], False: values[3]}
+    }
+
+
 if __name__ == "__main__":
     main()
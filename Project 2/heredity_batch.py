@@ -0,0 +1,151 @@
+"""
+Project 2
+CS50's Introduction to Artificial Intelligence with Python
+https://cs50.harvard.edu/ai/2023/
+
+Attempted by
+Daychyi Ku
+https://github.com/Daychyi
+
+Batch runner for heredity: infers many family files concurrently
+and writes every person's marginals as JSON lines.
+"""
+
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import heredity
+
+# Largest family solved by exact enumeration, bigger ones are sampled
+EXACT_LIMIT = 6
+
+SAMPLES = 100000
+TOLERANCE = 0.005
+
+
+def main():
+    if len(sys.argv) < 3:
+        sys.exit("Usage: python heredity_batch.py output.jsonl "
+                 "data.csv|directory ...")
+    filenames = csv_files(sys.argv[2:])
+    start = time.perf_counter()
+    if sys.argv[1] == "-":
+        count = run_batch(filenames, sys.stdout)
+    else:
+        with open(sys.argv[1], "w") as out:
+            count = run_batch(filenames, out)
+    print(f"{count} families from {len(filenames)} files "
+          f"in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+
+
+def csv_files(paths):
+    """
+    Expand directories in `paths` into the sorted CSV files they contain.
+    """
+    filenames = []
+    for path in paths:
+        if os.path.isdir(path):
+            filenames.extend(sorted(
+                os.path.join(path, name) for name in os.listdir(path)
+                if name.endswith(".csv")
+            ))
+        else:
+            filenames.append(path)
+    return filenames
+
+
+def family_key(pedigree, family):
+    """
+    Return a hashable description of the structure and evidence of
+    `family`, independent of names: one (mother, father, trait) triple
+    per member, with parents given as positions within the family.
+    """
+    position = {i: k for k, i in enumerate(family)}
+    return tuple(
+        (position.get(pedigree.mother[i], -1),
+         position.get(pedigree.father[i], -1),
+         pedigree.trait[i])
+        for i in family
+    )
+
+
+def infer_family(key):
+    """
+    Infer the family described by `key` (see `family_key`).
+    Return `(method, seconds, marginals)` with marginals listed
+    in the same order as the family members.
+    """
+    start = time.perf_counter()
+    people = {
+        k: {
+            "name": k,
+            "mother": mother if mother != -1 else None,
+            "father": father if father != -1 else None,
+            "trait": None if trait == -1 else bool(trait)
+        }
+        for k, (mother, father, trait) in enumerate(key)
+    }
+    if len(people) <= EXACT_LIMIT:
+        method = "exact"
+        probabilities = heredity.exact_probabilities(people)
+    else:
+        method = "gibbs"
+        probabilities, errors, n = heredity.sample_probabilities(
+            people, SAMPLES, method="gibbs", seed=0, tolerance=TOLERANCE
+        )
+    marginals = [probabilities[k] for k in range(len(key))]
+    return method, time.perf_counter() - start, marginals
+
+
+def run_batch(filenames, out, processes=None):
+    """
+    Infer every family in every file of `filenames` in a process pool,
+    writing one JSON line per person to `out`. Families with the same
+    structure and evidence are only inferred once.
+    Return the number of families written.
+    """
+    jobs = []
+    futures = {}
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        for filename in filenames:
+            try:
+                pedigree = heredity.load_pedigree(filename)
+            except (OSError, ValueError) as e:
+                jobs.append((filename, None, str(e), None))
+                continue
+            for number, family in enumerate(pedigree.families()):
+                key = family_key(pedigree, family)
+                cached = key in futures
+                if not cached:
+                    futures[key] = executor.submit(infer_family, key)
+                names = [pedigree.names[i] for i in family]
+                jobs.append((filename, number, names, (key, cached)))
+
+        count = 0
+        for filename, number, names, job in jobs:
+            if job is None:
+                out.write(json.dumps({"file": filename, "error": names}) + "\n")
+                continue
+            key, cached = job
+            method, seconds, marginals = futures[key].result()
+            for name, marginal in zip(names, marginals):
+                out.write(json.dumps({
+                    "file": filename,
+                    "family": number,
+                    "person": name,
+                    "gene": {str(g): p for g, p in marginal["gene"].items()},
+                    "trait": {str(t).lower(): p
+                              for t, p in marginal["trait"].items()},
+                    "method": method,
+                    "seconds": round(seconds, 6),
+                    "cached": cached
+                }) + "\n")
+            count += 1
+    return count
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Project 2
+CS50's Introduction to Artificial Intelligence with Python
+https://cs50.harvard.edu/ai/2023/
+
+Attempted by
+Daychyi Ku
+https://github.com/Daychyi
+
+Consistency check for heredity: compares the table-based
+`joint_probability` with a reference computed straight from PROBS, for
+every gene and trait assignment of a few fixed and seeded random
+families. Exits with an error on the first mismatch.
+"""
+
+import random
+import sys
+
+from heredity import PROBS, joint_probability, powerset
+
+# Random families checked on top of the fixed ones, and their size
+RANDOM_FAMILIES = 20
+RANDOM_SIZE = 5
+
+# Largest relative difference accepted between the two computations
+RELATIVE_TOLERANCE = 1e-12
+
+
+def main():
+    seed = int(sys.argv[1]) if len(sys.argv) > 1 else 0
+    families = fixed_families() + random_families(seed)
+    checked = 0
+    for k, people in enumerate(families):
+        for p, reference, assignment in compare(people):
+            checked += 1
+            if abs(p - reference) > RELATIVE_TOLERANCE * reference:
+                one_gene, two_genes, have_trait = assignment
+                sys.exit(f"Family {k}: one_gene={sorted(one_gene)}, "
+                         f"two_genes={sorted(two_genes)}, "
+                         f"have_trait={sorted(have_trait)}: "
+                         f"{p} != {reference}")
+    print(f"{checked} joint probabilities in {len(families)} families "
+          f"match the reference")
+
+
+def family(rows):
+    """
+    Return a `people` dictionary like `heredity.load_data` from
+    (name, mother, father, trait) rows.
+    """
+    return {
+        name: {"name": name, "mother": mother, "father": father,
+               "trait": trait}
+        for name, mother, father, trait in rows
+    }
+
+
+def fixed_families():
+    """
+    Return the families of the CS50 examples, plus three generations.
+    """
+    return [
+        family([
+            ("Harry", "Lily", "James", None),
+            ("James", None, None, True),
+            ("Lily", None, None, False)
+        ]),
+        family([
+            ("Arthur", None, None, False),
+            ("Charlie", "Molly", "Arthur", False),
+            ("Fred", "Molly", "Arthur", True),
+            ("Ginny", "Molly", "Arthur", None),
+            ("Molly", None, None, False),
+            ("Ron", "Molly", "Arthur", None)
+        ]),
+        family([
+            ("Arthur", None, None, False),
+            ("Hermione", None, None, False),
+            ("Molly", None, None, None),
+            ("Ron", "Molly", "Arthur", False),
+            ("Rose", "Hermione", "Ron", True)
+        ])
+    ]
+
+
+def random_families(seed):
+    """
+    Return RANDOM_FAMILIES seeded random families of RANDOM_SIZE people,
+    each person after the first two having earlier people as parents.
+    """
+    rng = random.Random(seed)
+    families = []
+    for _ in range(RANDOM_FAMILIES):
+        rows = []
+        for i in range(RANDOM_SIZE):
+            mother = father = None
+            if i >= 2 and rng.random() < 0.7:
+                mother, father = (str(j) for j in rng.sample(range(i), 2))
+            trait = rng.choice((None, True, False))
+            rows.append((str(i), mother, father, trait))
+        families.append(family(rows))
+    return families
+
+
+def reference_probability(people, one_gene, two_genes, have_trait):
+    """
+    Return the joint probability of the assignment computed from PROBS
+    directly, following the Heredity specification step by step.
+    """
+    def genes(person):
+        return 2 if person in two_genes else 1 if person in one_gene else 0
+
+    def passes(parent):
+        return {0: PROBS["mutation"], 1: 0.5,
+                2: 1 - PROBS["mutation"]}[genes(parent)]
+
+    p = 1.0
+    for person in people:
+        count = genes(person)
+        mother = people[person]["mother"]
+        father = people[person]["father"]
+        if mother is None:
+            p *= PROBS["gene"][count]
+        else:
+            m, f = passes(mother), passes(father)
+            if count == 2:
+                p *= m * f
+            elif count == 1:
+                p *= m * (1 - f) + (1 - m) * f
+            else:
+                p *= (1 - m) * (1 - f)
+        p *= PROBS["trait"][count][person in have_trait]
+    return p
+
+
+def compare(people):
+    """
+    Yield `(p, reference, (one_gene, two_genes, have_trait))` for every
+    gene and trait assignment of `people`, where `p` comes from
+    `joint_probability` and `reference` from `reference_probability`.
+    """
+    names = set(people)
+    for have_trait in powerset(names):
+        for one_gene in powerset(names):
+            for two_genes in powerset(names - one_gene):
+                yield (
+                    joint_probability(people, one_gene, two_genes,
+                                      have_trait),
+                    reference_probability(people, one_gene, two_genes,
+                                          have_trait),
+                    (one_gene, two_genes, have_trait)
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,446 @@
+"""
+Project 2
+CS50's Introduction to Artificial Intelligence with Python
+https://cs50.harvard.edu/ai/2023/
+
+Attempted by
+Daychyi Ku
+https://github.com/Daychyi
+
+Junction tree inference for heredity: the structure of a family is
+compiled once into a tree of cliques over gene counts, cached on disk
+by structure, and every new set of observed traits or PROBS table is
+answered by message passing over the compiled tree alone.
+"""
+
+import array
+import hashlib
+import heapq
+import operator
+import os
+import pickle
+import sys
+import time
+
+from heredity import MODEL, load_pedigree
+
+# NumPy is optional: without it, `query_many` works on lists
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+CACHE_DIR = ".heredity_cache"
+
+# Largest clique compiled: its table holds 3 ** size entries,
+# every one visited by each query
+MAX_CLIQUE = 8
+
+
+def main():
+    if len(sys.argv) not in (2, 3):
+        sys.exit("Usage: python heredity_junction.py data.csv [cache]")
+    try:
+        pedigree = load_pedigree(sys.argv[1])
+    except ValueError as e:
+        sys.exit(str(e))
+    cache_dir = sys.argv[2] if len(sys.argv) == 3 else \
+        os.path.join(os.path.dirname(sys.argv[1]), CACHE_DIR)
+
+    probabilities = {}
+    for family in pedigree.families():
+        start = time.perf_counter()
+        try:
+            tree, cached = cached_tree(structure_key(pedigree, family),
+                                       cache_dir)
+        except ValueError as e:
+            sys.exit(str(e))
+        compiled = time.perf_counter()
+        traits = [None if pedigree.trait[i] == -1 else bool(pedigree.trait[i])
+                  for i in family]
+        marginals = tree.query(traits)
+        end = time.perf_counter()
+        print(f"{len(family)} people: {'loaded' if cached else 'compiled'} "
+              f"in {compiled - start:.4f}s, queried in {end - compiled:.4f}s "
+              f"(largest clique {tree.width()})", file=sys.stderr)
+        for i, marginal in zip(family, marginals):
+            probabilities[pedigree.names[i]] = marginal
+
+    for person in pedigree.rows():
+        print(f"{person}:")
+        for field in probabilities[person]:
+            print(f"  {field.capitalize()}:")
+            for value in probabilities[person][field]:
+                p = probabilities[person][field][value]
+                print(f"    {value}: {p:.4f}")
+
+
+def structure_key(pedigree, family):
+    """
+    Return the structure of `family` independent of names and traits:
+    one (mother, father) pair per member, with parents given as
+    positions within the family, -1 for founders.
+    """
+    position = {i: k for k, i in enumerate(family)}
+    return tuple(
+        (position.get(pedigree.mother[i], -1),
+         position.get(pedigree.father[i], -1))
+        for i in family
+    )
+
+
+def cached_tree(key, cache_dir):
+    """
+    Return `(tree, cached)`: the JunctionTree of the structure `key`,
+    loaded from `cache_dir` if it was compiled before, otherwise
+    compiled and saved there, and whether it came from the cache.
+
+    Only the tree's attributes are saved, as plain lists and arrays,
+    so cache files do not depend on the module defining the class.
+    Files that cannot be read back are compiled again.
+    """
+    digest = hashlib.sha1(repr(key).encode()).hexdigest()
+    path = os.path.join(cache_dir, f"{digest}.pickle")
+    try:
+        with open(path, "rb") as f:
+            state = pickle.load(f)
+        if isinstance(state, dict) and state.get("parents") == list(key):
+            return JunctionTree.from_state(state), True
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError,
+            ImportError, TypeError, ValueError):
+        pass
+    tree = JunctionTree(key)
+    os.makedirs(cache_dir, exist_ok=True)
+    temp = path + ".tmp"
+    with open(temp, "wb") as f:
+        pickle.dump(vars(tree), f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp, path)
+    return tree, False
+
+
+def _index(variables, subset):
+    """
+    Return an array mapping every entry of a table over `variables`
+    to the entry of a table over `subset` with the same gene counts.
+    Tables hold 3 ** len(variables) entries, the first variable
+    varying fastest.
+    """
+    place = {v: 3 ** k for k, v in enumerate(subset)}
+    index = [0]
+    for v in variables:
+        step = place.get(v)
+        if step is None:
+            index = index * 3
+        else:
+            index = [base + g * step for g in range(3) for base in index]
+    return array.array("i", index)
+
+
+class JunctionTree():
+    """
+    Clique tree over the gene counts of one family, built from
+    `parents`, a list of (mother, father) positions per member
+    (-1 for founders). Independent of traits and PROBS, so it can be
+    compiled once and queried with any evidence and model.
+    Raises ValueError if a clique would hold more than MAX_CLIQUE people.
+    """
+
+    def __init__(self, parents):
+        self.parents = list(parents)
+        n = len(self.parents)
+
+        # Moral graph: everyone is linked to their parents,
+        # and the parents of a child to each other
+        neighbors = [set() for _ in range(n)]
+        for child, (mother, father) in enumerate(self.parents):
+            if mother != -1:
+                family = (child, mother, father)
+                for a in family:
+                    neighbors[a].update(b for b in family if b != a)
+
+        # Eliminate people with fewest neighbors first; each elimination
+        # gives a clique whose parent is the clique of the neighbor
+        # eliminated next, which contains all of the shared neighbors
+        eliminated = [-1] * n
+        cliques = []
+        heap = [(len(neighbors[v]), v) for v in range(n)]
+        heapq.heapify(heap)
+        while heap:
+            degree, v = heapq.heappop(heap)
+            if eliminated[v] != -1 or degree != len(neighbors[v]):
+                continue
+            eliminated[v] = len(cliques)
+            cliques.append([v] + sorted(neighbors[v]))
+            if len(cliques[-1]) > MAX_CLIQUE:
+                raise ValueError(f"Family too entangled: clique of "
+                                 f"{len(cliques[-1])} people")
+            for u in neighbors[v]:
+                neighbors[u].discard(v)
+                neighbors[u].update(w for w in neighbors[v] if w != u)
+                heapq.heappush(heap, (len(neighbors[u]), u))
+        self.cliques = cliques
+        self.parent = [
+            min((eliminated[u] for u in clique[1:]), default=-1)
+            for clique in cliques
+        ]
+
+        # Index arrays from clique entries to separator entries,
+        # both for the clique itself and for its parent clique
+        self.separator = [clique[1:] for clique in cliques]
+        self.down_index = [_index(clique, separator) for clique, separator
+                           in zip(cliques, self.separator)]
+        self.up_index = [
+            _index(cliques[p], separator) if p != -1 else None
+            for p, separator in zip(self.parent, self.separator)
+        ]
+
+        # Every person's gene factor lives in the clique of whoever of
+        # them and their parents was eliminated first, and their
+        # marginal is read from the clique where they were eliminated
+        self.home = []
+        self.factor_index = []
+        for child, (mother, father) in enumerate(self.parents):
+            scope = [child] if mother == -1 else [child, mother, father]
+            home = min(eliminated[v] for v in scope)
+            self.home.append(home)
+            self.factor_index.append(_index(cliques[home], scope))
+        self.marginal_index = [_index(cliques[eliminated[v]], [v])
+                               for v in range(n)]
+        self.eliminated = eliminated
+
+    @classmethod
+    def from_state(cls, state):
+        """
+        Return the tree whose attributes are the dictionary `state`,
+        as saved by `cached_tree`, without compiling it again.
+        """
+        tree = cls.__new__(cls)
+        tree.__dict__.update(state)
+        return tree
+
+    def width(self):
+        """
+        Return the number of people in the largest clique.
+        """
+        return max((len(clique) for clique in self.cliques), default=0)
+
+    def query(self, traits, model=MODEL):
+        """
+        Return the gene and trait marginals of every member given
+        `traits`, a list of True, False or None (unknown) per member,
+        and `model`, lookup tables from `heredity.compile_model`.
+        Marginals are dictionaries in the format of
+        `heredity.exact_probabilities`, listed in member order.
+        """
+        founder = model["founder"]
+        inherit = model["inherit"]
+        trait = model["trait"]
+
+        # Clique potentials: products of the gene factors, each
+        # weighted by the likelihood of the person's observed trait
+        potentials = [[1.0] * 3 ** len(clique) for clique in self.cliques]
+        for child, (mother, father) in enumerate(self.parents):
+            t = traits[child]
+            likelihood = [1.0] * 3 if t is None else \
+                [trait[g][t] for g in range(3)]
+            if mother == -1:
+                factor = [founder[g] * likelihood[g] for g in range(3)]
+            else:
+                factor = [inherit[g][m][f] * likelihood[g]
+                          for f in range(3) for m in range(3)
+                          for g in range(3)]
+            potential = potentials[self.home[child]]
+            for k, j in enumerate(self.factor_index[child]):
+                potential[k] *= factor[j]
+
+        # Collect towards the roots; children come before their parents
+        up = [None] * len(self.cliques)
+        for i, p in enumerate(self.parent):
+            if p == -1:
+                continue
+            message = _project(potentials[i], self.down_index[i],
+                               len(self.separator[i]))
+            up[i] = message
+            potential = potentials[p]
+            for k, j in enumerate(self.up_index[i]):
+                potential[k] *= message[j]
+
+        # Distribute back from the roots, dividing out each clique's own
+        # message (0 / 0 = 0, as that entry is impossible anyway)
+        for i in reversed(range(len(self.cliques))):
+            p = self.parent[i]
+            if p == -1:
+                continue
+            message = _project(potentials[p], self.up_index[i],
+                               len(self.separator[i]))
+            ratio = [m / u if u else 0.0 for m, u in zip(message, up[i])]
+            potential = potentials[i]
+            for k, j in enumerate(self.down_index[i]):
+                potential[k] *= ratio[j]
+
+        marginals = []
+        for v, t in enumerate(traits):
+            genes = _project(potentials[self.eliminated[v]],
+                             self.marginal_index[v], 1)
+            if t is None:
+                has_trait = sum(genes[g] * trait[g][1] for g in range(3))
+            else:
+                has_trait = float(t)
+            marginals.append({
+                "gene": {2: genes[2], 1: genes[1], 0: genes[0]},
+                "trait": {True: has_trait, False: 1 - has_trait}
+            })
+        return marginals
+
+    def query_many(self, traits, models):
+        """
+        Return, for every model of `models`, the marginals `query`
+        would return for `traits` and that model.
+
+        Every table entry holds one value per model, so each pass over
+        the index arrays serves all models at once: with NumPy as whole
+        array operations, otherwise as lists of values per entry.
+        """
+        count = len(models)
+        founder = _rows([[model["founder"][g] for model in models]
+                         for g in range(3)])
+        inherit = _rows([[model["inherit"][g][m][f] for model in models]
+                         for f in range(3) for m in range(3)
+                         for g in range(3)])
+        trait = [[[model["trait"][g][t] for model in models]
+                  for t in range(2)] for g in range(3)]
+        unknown = _rows([[1.0] * count] * 3)
+        observed = [_rows([trait[g][t] for g in range(3)]) for t in range(2)]
+
+        # Clique potentials: products of the gene factors, each
+        # weighted by the likelihood of the person's observed trait
+        potentials = [_rows([[1.0] * count] * 3 ** len(clique))
+                      for clique in self.cliques]
+        for child, (mother, father) in enumerate(self.parents):
+            t = traits[child]
+            likelihood = unknown if t is None else observed[t]
+            if mother == -1:
+                factor = _times(founder, likelihood)
+            else:
+                factor = _times(inherit, _take(likelihood, _GENE_INDEX))
+            home = self.home[child]
+            potentials[home] = _times(
+                potentials[home], _take(factor, self.factor_index[child]))
+
+        # Collect towards the roots; children come before their parents
+        up = [None] * len(self.cliques)
+        for i, p in enumerate(self.parent):
+            if p == -1:
+                continue
+            message = _project_many(potentials[i], self.down_index[i],
+                                    len(self.separator[i]), count)
+            up[i] = message
+            potentials[p] = _times(potentials[p],
+                                   _take(message, self.up_index[i]))
+
+        # Distribute back from the roots, dividing out each clique's own
+        # message (0 / 0 = 0, as that entry is impossible anyway)
+        for i in reversed(range(len(self.cliques))):
+            p = self.parent[i]
+            if p == -1:
+                continue
+            message = _project_many(potentials[p], self.up_index[i],
+                                    len(self.separator[i]), count)
+            potentials[i] = _times(
+                potentials[i],
+                _take(_divide(message, up[i]), self.down_index[i]))
+
+        results = [[] for _ in models]
+        for v, t in enumerate(traits):
+            genes = _project_many(potentials[self.eliminated[v]],
+                                  self.marginal_index[v], 1, count)
+            for x, marginals in enumerate(results):
+                gene = [float(genes[g][x]) for g in range(3)]
+                if t is None:
+                    has_trait = sum(gene[g] * trait[g][1][x]
+                                    for g in range(3))
+                else:
+                    has_trait = float(t)
+                marginals.append({
+                    "gene": {2: gene[2], 1: gene[1], 0: gene[0]},
+                    "trait": {True: has_trait, False: 1 - has_trait}
+                })
+        return results
+
+
+def _project(table, index, size):
+    """
+    Return the normalized sums of `table` over the entries of a
+    table with `size` variables, following `index`.
+    """
+    sums = [0.0] * 3 ** size
+    for value, j in zip(table, index):
+        sums[j] += value
+    total = sum(sums)
+    if total:
+        sums = [s / total for s in sums]
+    return sums
+
+
+# Gene count of the child for every entry of an inheritance factor,
+# whose entries are ordered child, mother, father, the child fastest
+_GENE_INDEX = array.array("i", [g for _ in range(9) for g in range(3)])
+
+
+def _rows(rows):
+    """
+    Return a table of one value per model for each entry of `rows`,
+    a list of lists: a 2-D array with NumPy, otherwise the lists.
+    """
+    return rows if np is None else np.array(rows, dtype=float)
+
+
+def _take(table, index):
+    """
+    Return the entries of `table` at the positions of `index`.
+    """
+    if np is None:
+        return [table[j] for j in index]
+    return table[np.frombuffer(index, dtype=np.int32)]
+
+
+def _times(a, b):
+    """
+    Return the entry by entry, model by model products of two tables.
+    """
+    if np is None:
+        return [list(map(operator.mul, x, y)) for x, y in zip(a, b)]
+    return a * b
+
+
+def _divide(a, b):
+    """
+    Return the quotients of two tables, 0 wherever `b` is 0.
+    """
+    if np is None:
+        return [[m / u if u else 0.0 for m, u in zip(x, y)]
+                for x, y in zip(a, b)]
+    return np.divide(a, b, out=np.zeros_like(a), where=b != 0)
+
+
+def _project_many(table, index, size, models):
+    """
+    Return the sums of `table` over the entries of a table with `size`
+    variables, following `index`, normalized separately for each of
+    the `models` values every entry holds.
+    """
+    if np is None:
+        sums = [[0.0] * models for _ in range(3 ** size)]
+        for values, j in zip(table, index):
+            sums[j] = list(map(operator.add, sums[j], values))
+        totals = [sum(column) for column in zip(*sums)]
+        return [[v / total if total else v for v, total in zip(row, totals)]
+                for row in sums]
+    sums = np.zeros((3 ** size, models))
+    np.add.at(sums, np.frombuffer(index, dtype=np.int32), table)
+    totals = sums.sum(axis=0)
+    return np.divide(sums, totals, out=sums.copy(), where=totals != 0)
+
+
+if __name__ == "__main__":
+    main()
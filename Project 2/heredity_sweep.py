@@ -0,0 +1,130 @@
+"""
+Project 2
+CS50's Introduction to Artificial Intelligence with Python
+https://cs50.harvard.edu/ai/2023/
+
+Attempted by
+Daychyi Ku
+https://github.com/Daychyi
+
+Parameter sweeps for heredity: marginals of every person under a grid
+of PROBS variants, such as different mutation rates or penetrances.
+Each family is compiled once into a junction tree, and all parameter
+sets are answered by a single round of message passing whose tables
+hold one value per parameter set.
+"""
+
+import copy
+import csv
+import itertools
+import sys
+
+from heredity import PROBS, compile_model, load_pedigree
+from heredity_junction import JunctionTree, structure_key
+
+
+def main():
+    if len(sys.argv) < 3:
+        sys.exit("Usage: python heredity_sweep.py data.csv "
+                 "parameter=value,value ...")
+    try:
+        pedigree = load_pedigree(sys.argv[1])
+        axes = {}
+        for arg in sys.argv[2:]:
+            path, _, values = arg.partition("=")
+            axes[path] = [float(value) for value in values.split(",")]
+        grid, settings = parameter_grid(axes)
+        table = sweep(pedigree, grid)
+    except ValueError as e:
+        sys.exit(str(e))
+
+    writer = csv.writer(sys.stdout)
+    writer.writerow(["name", *axes, "gene 2", "gene 1", "gene 0", "trait"])
+    for person in pedigree.rows():
+        for setting, marginal in zip(settings, table[person]):
+            writer.writerow([
+                person, *setting,
+                *(f"{marginal['gene'][g]:.4f}" for g in (2, 1, 0)),
+                f"{marginal['trait'][True]:.4f}"
+            ])
+
+
+def set_parameter(probs, path, value):
+    """
+    Set one parameter of `probs` in place, named by `path`:
+        * "mutation": the mutation probability,
+        * "gene.1" or "gene.2": probability of one or two copies without
+          parents, the probability of no copies being left to
+          `set_parameters`,
+        * "trait.0", "trait.1" or "trait.2": probability of the trait
+          given that many copies of the gene.
+    Raises ValueError for unknown paths or probabilities outside [0, 1].
+    """
+    if not 0 <= value <= 1:
+        raise ValueError(f"{path}: {value} is not a probability")
+    field, _, key = path.partition(".")
+    if field == "mutation" and not key:
+        probs["mutation"] = value
+    elif field == "gene" and key in ("1", "2"):
+        probs["gene"][int(key)] = value
+    elif field == "trait" and key in ("0", "1", "2"):
+        probs["trait"][int(key)] = {True: value, False: 1 - value}
+    else:
+        raise ValueError(f"Unknown parameter: {path}")
+
+
+def set_parameters(probs, values):
+    """
+    Set every parameter of `values`, a dictionary mapping parameter
+    paths (see `set_parameter`) to values, in `probs` in place, then
+    leave the rest of the gene probabilities to no copies.
+    Raises ValueError if a value is invalid, or if the probabilities of
+    one and two copies add up to more than 1 once all are set.
+    """
+    for path, value in values.items():
+        set_parameter(probs, path, value)
+    probs["gene"][0] = 1 - probs["gene"][1] - probs["gene"][2]
+    if probs["gene"][0] < 0:
+        raise ValueError(f"{values}: gene probabilities exceed 1")
+
+
+def parameter_grid(axes, base=PROBS):
+    """
+    Return `(grid, settings)` for every combination of the values in
+    `axes`, a dictionary mapping parameter paths (see `set_parameter`)
+    to lists of values: `grid` lists the PROBS variants built from
+    `base`, and `settings` the matching tuples of values.
+    """
+    grid = []
+    settings = list(itertools.product(*axes.values()))
+    for setting in settings:
+        probs = copy.deepcopy(base)
+        set_parameters(probs, dict(zip(axes, setting)))
+        grid.append(probs)
+    return grid, settings
+
+
+def sweep(pedigree, grid):
+    """
+    Return a dictionary mapping every person in `pedigree` to a list of
+    their marginals under each PROBS variant of `grid`, in grid order,
+    in the format of `heredity.exact_probabilities`.
+
+    Each family's junction tree is compiled once and each variant's
+    lookup tables once, then all variants are answered together by
+    `JunctionTree.query_many`.
+    """
+    models = [compile_model(probs) for probs in grid]
+    table = {}
+    for family in pedigree.families():
+        tree = JunctionTree(structure_key(pedigree, family))
+        traits = [None if pedigree.trait[i] == -1 else bool(pedigree.trait[i])
+                  for i in family]
+        results = tree.query_many(traits, models)
+        for k, i in enumerate(family):
+            table[pedigree.names[i]] = [marginals[k] for marginals in results]
+    return table
+
+
+if __name__ == "__main__":
+    main()
@@ -9,10 +9,23 @@ https://github.com/Daychyi
 
 """
 
+import array
+import csv
+import json
+import mmap
 import os
 import random
 import re
 import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+# NumPy is optional: without it, random walks run one step at a time
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 
 DAMPING = 0.85
@@ -20,15 +33,30 @@ SAMPLES = 10000
 
 
 def main():
-    if len(sys.argv) != 2:
-        sys.exit("Usage: python pagerank.py corpus")
-    corpus = crawl(sys.argv[1])
-    ranks = sample_pagerank(corpus, DAMPING, SAMPLES)
+    if len(sys.argv) not in (2, 3, 4):
+        sys.exit("Usage: python pagerank.py corpus "
+                 "[power|gauss-seidel|extrapolated|blocks "
+                 "[diagnostics.csv|.json]]")
+    solver = sys.argv[2] if len(sys.argv) > 2 else "power"
+    if solver not in SOLVERS:
+        sys.exit(f"Unknown solver: {solver}")
+    graph = LinkGraph(*crawl_edges(sys.argv[1]))
+    counts = sample_counts(graph, DAMPING, SAMPLES)
+    ranks = graph.ranks_by_page(c / SAMPLES for c in counts)
     print(f"PageRank Results from Sampling (n = {SAMPLES})")
     for page in sorted(ranks):
         print(f"  {page}: {ranks[page]:.4f}")
-    ranks = iterate_pagerank(corpus, DAMPING)
-    print(f"PageRank Results from Iteration")
+    records = []
+    ranks, stats = power_iteration(
+        graph, DAMPING, solver=solver,
+        callback=(lambda record: records.append(without_ranks(record)))
+        if len(sys.argv) > 3 else None
+    )
+    if len(sys.argv) > 3:
+        export_diagnostics(records, sys.argv[3])
+    ranks = graph.ranks_by_page(ranks)
+    print(f"PageRank Results from Iteration ({solver}, "
+          f"{stats['iterations']:.4g} iterations, {stats['seconds']:.4f}s)")
     for page in sorted(ranks):
         print(f"  {page}: {ranks[page]:.4f}")
 
@@ -60,6 +88,119 @@ def crawl(directory):
     return pages
 
 
+# Same pattern as `crawl`, matched directly against file bytes
+LINK_PATTERN = re.compile(rb"<a\s+(?:[^>]*?)href=\"([^\"]*)\"")
+
+# Files at least this large are memory-mapped rather than read
+MMAP_SIZE = 1 << 20
+
+# Encoded page name -> id, set in every crawler worker
+_page_ids = None
+
+
+def corpus_pages(directory):
+    """
+    Return the sorted names of the HTML pages in `directory`,
+    in the order that gives them their page ids.
+    """
+    return sorted(
+        entry.name for entry in os.scandir(directory)
+        if entry.name.endswith(".html") and entry.is_file()
+    )
+
+
+def edge_batches(directory, pages, processes=None, batch=256):
+    """
+    Yield the links between the `pages` of `directory` (as listed by
+    `corpus_pages`) as `(src, dst)` arrays of page ids, one pair per
+    `batch` pages, in page order. Files are parsed in a pool of
+    `processes` worker processes (one per CPU by default, no pool if 1)
+    running at most two batches per worker ahead of the consumer, so
+    memory use does not grow with the corpus.
+    """
+    page_ids = {page: i for i, page in enumerate(pages)}
+    batches = (
+        [(i, os.path.join(directory, pages[i]))
+         for i in range(start, min(start + batch, len(pages)))]
+        for start in range(0, len(pages), batch)
+    )
+
+    def arrays(result):
+        src = array.array("i")
+        dst = array.array("i")
+        src.frombytes(result[0])
+        dst.frombytes(result[1])
+        return src, dst
+
+    processes = processes or os.cpu_count() or 1
+    if processes == 1 or len(pages) <= batch:
+        _set_page_ids(page_ids)
+        for files in batches:
+            yield arrays(extract_edges(files))
+        return
+    with ProcessPoolExecutor(max_workers=processes,
+                             initializer=_set_page_ids,
+                             initargs=(page_ids,)) as executor:
+        pending = deque()
+        for files in batches:
+            pending.append(executor.submit(extract_edges, files))
+            if len(pending) >= 2 * processes:
+                yield arrays(pending.popleft().result())
+        while pending:
+            yield arrays(pending.popleft().result())
+
+
+def crawl_edges(directory, processes=None, batch=256):
+    """
+    Parse a directory of HTML pages like `crawl`, in a pool of
+    `processes` worker processes (one per CPU by default, no pool if 1).
+
+    Return `(pages, src, dst)`: the list of page names and two arrays
+    of page ids, one per link `src[k]` -> `dst[k]` between two different
+    pages of the corpus, ready for `LinkGraph(pages, src, dst)`.
+    """
+    pages = corpus_pages(directory)
+    src = array.array("i")
+    dst = array.array("i")
+    for s, d in edge_batches(directory, pages, processes, batch):
+        src.extend(s)
+        dst.extend(d)
+    return pages, src, dst
+
+
+def _set_page_ids(page_ids):
+    global _page_ids
+    _page_ids = {os.fsencode(page): i for page, i in page_ids.items()}
+
+
+def extract_edges(files):
+    """
+    Return the links found in a batch of `(page id, path)` files as
+    the bytes of two id arrays, source ids and destination ids.
+    Files larger than MMAP_SIZE are memory-mapped and scanned in place
+    instead of being read into memory.
+    """
+    src = array.array("i")
+    dst = array.array("i")
+    for i, path in files:
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                continue
+            if size < MMAP_SIZE:
+                found = LINK_PATTERN.findall(f.read())
+            else:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                    found = LINK_PATTERN.findall(m)
+        links = {_page_ids.get(link) for link in found}
+        links.discard(None)
+        links.discard(i)
+        for j in sorted(links):
+            src.append(i)
+            dst.append(j)
+    return src.tobytes(), dst.tobytes()
+
+
 def transition_model(corpus, page, damping_factor):
     """
     Return a probability distribution over which page to visit next,
@@ -100,30 +241,160 @@ def sample_pagerank(corpus, damping_factor, n):
     their estimated PageRank value (a value between 0 and 1). All
     PageRank values should sum to 1.
     """
-    # print(f"corpus:{corpus}")
+    graph = LinkGraph.from_corpus(corpus)
+    counts = sample_counts(graph, damping_factor, n)
+    return graph.ranks_by_page(c / n for c in counts)
 
-    prev_sample = []
-    current_sample = []
-    sample = []
-    pages = list(corpus.keys())
-    
-    # n=1000000
-    for i in range(n):
-        if i==0:
-            current_sample = [random.choice(pages)]
-            page_prob = {k:1/len(pages) for k in pages}
+
+def sample_counts(graph, damping_factor, n, rng=random, burn_in=0):
+    """
+    Walk `n` pages of `graph` as a random surfer, starting at a page
+    chosen at random, and return the visit count of every page id.
+    With `burn_in`, that many steps are walked first without counting,
+    so the start page no longer biases the counts.
+
+    Each step takes one random number: below `damping_factor` it picks
+    one of the current page's links, otherwise (or on a page without
+    links) any page, so a step costs O(1) regardless of corpus size.
+    """
+    pages = len(graph)
+    counts = array.array("q", bytes(8 * pages))
+    if n <= 0:
+        return counts
+    targets = graph.targets
+    offsets = graph.target_offsets
+    outdegree = graph.outdegree
+    draw = rng.random
+
+    page = int(draw() * pages)
+    for _ in range(burn_in):
+        u = draw()
+        links = outdegree[page]
+        if u < damping_factor and links:
+            page = targets[offsets[page] + int(u / damping_factor * links)]
         else:
-            page_prob, current_sample = transition_model(corpus, prev_sample, damping_factor)
-            
-        prev_sample = current_sample[0]
-        sample.append(current_sample[0])
-        
-    # print(f"sample:{sample}")
-    # print(f"pages:{pages}")
-    return {k:sample.count(k)/n for k in pages}
-    # raise NotImplementedError
+            page = int(draw() * pages)
+    counts[page] += 1
+    for _ in range(n - 1):
+        u = draw()
+        links = outdegree[page]
+        if u < damping_factor and links:
+            page = targets[offsets[page] + int(u / damping_factor * links)]
+        else:
+            page = int(draw() * pages)
+        counts[page] += 1
+    return counts
+
 
-def iterate_pagerank(corpus, damping_factor):
+def lockstep_counts(graph, damping_factor, n, walkers, burn_in, seed):
+    """
+    Walk `n` pages of `graph` with `walkers` random surfers moving in
+    lockstep, and return the visit count of every page id as a NumPy
+    array. Every step draws the next pages of all walkers in a few
+    vectorized operations, like one step of `sample_counts` each.
+    Every walker first walks `burn_in` uncounted steps from a page
+    chosen at random; the last counted step only counts as many walkers
+    as needed to take exactly `n` samples. Requires NumPy.
+    """
+    pages = len(graph)
+    counts = np.zeros(pages, dtype=np.int64)
+    if n <= 0:
+        return counts
+    rng = np.random.default_rng(seed)
+    targets = np.frombuffer(graph.targets, dtype=np.int32)
+    offsets = np.frombuffer(graph.target_offsets, dtype=np.int64)
+    outdegree = np.frombuffer(graph.outdegree, dtype=np.int32)
+    walkers = max(1, min(walkers, n))
+
+    position = rng.integers(pages, size=walkers)
+    for step in range(burn_in + -(-n // walkers)):
+        u = rng.random(walkers)
+        links = outdegree[position]
+        follow = (u < damping_factor) & (links > 0)
+        following = position[follow]
+        position = rng.integers(pages, size=walkers)
+        position[follow] = targets[
+            offsets[following] +
+            (u[follow] / damping_factor * links[follow]).astype(np.int64)
+        ]
+        if step >= burn_in:
+            counted = min(walkers, n)
+            counts += np.bincount(position[:counted], minlength=pages)
+            n -= counted
+    return counts
+
+
+# Walkers advanced together by `lockstep_counts` in every shard
+WALKERS = 10000
+
+# Burn-in of a shard's walk, in expected runs between teleports
+BURN_IN_RUNS = 10
+
+# Every shard walks at least this many times its burn-in
+MIN_SHARD_RUNS = 100
+
+
+def walk_counts(graph, damping_factor, n, walkers, burn_in, seed):
+    """
+    Return the visit counts of one shard: `n` pages walked after
+    `burn_in` uncounted steps, seeded by `seed`, by `lockstep_counts`
+    with `walkers` walkers if NumPy is available and `walkers` is
+    above 1, otherwise by a single `sample_counts` walk.
+    """
+    if np is not None and walkers > 1:
+        return lockstep_counts(graph, damping_factor, n, walkers, burn_in,
+                               seed).tolist()
+    return sample_counts(graph, damping_factor, n, random.Random(seed),
+                         burn_in)
+
+
+def walk_pagerank(graph, damping_factor, n, processes=None, seed=None,
+                  walkers=WALKERS):
+    """
+    Estimate PageRank from exactly `n` samples of random surfers,
+    sharded over `processes` worker processes (one shard per CPU by
+    default, no pool if 1). Every shard walks its own stream seeded
+    from `seed` and discards a burn-in of BURN_IN_RUNS / (1 - d) steps
+    first; shards are only added while each still walks at least
+    MIN_SHARD_RUNS times its burn-in. Visit counts are merged at the end.
+
+    With NumPy, each shard advances `walkers` surfers in lockstep
+    (see `lockstep_counts`); without it, or with `walkers` of 1, each
+    shard is one surfer walking a step at a time.
+
+    Return a list of estimated ranks indexed by page id.
+    """
+    processes = processes or os.cpu_count() or 1
+    burn_in = int(BURN_IN_RUNS / (1 - damping_factor)) + 1
+    shards = max(1, min(processes, n // (MIN_SHARD_RUNS * burn_in)))
+    size, extra = divmod(n, shards)
+    seeds = random.Random(seed)
+    jobs = [(graph, damping_factor, size + (k < extra), walkers, burn_in,
+             seeds.getrandbits(64)) for k in range(shards)]
+
+    if shards == 1:
+        results = [walk_counts(*jobs[0])]
+    else:
+        with ProcessPoolExecutor(max_workers=shards) as executor:
+            results = list(executor.map(walk_counts, *zip(*jobs)))
+
+    counts = [0] * len(graph)
+    for result in results:
+        for i, c in enumerate(result):
+            counts[i] += c
+    return [c / n for c in counts] if n > 0 else counts
+
+
+def rank_distance(ranks, other):
+    """
+    Return the L1 distance between two lists of ranks, for example to
+    check sampled ranks against those from `power_iteration`.
+    """
+    return sum(abs(a - b) for a, b in zip(ranks, other))
+
+
+def iterate_pagerank(corpus, damping_factor, tolerance=0.001,
+                     max_iterations=1000):
     """
     Return PageRank values for each page by iteratively updating
     PageRank values until convergence.
@@ -132,39 +403,501 @@ def iterate_pagerank(corpus, damping_factor):
     their estimated PageRank value (a value between 0 and 1). All
     PageRank values should sum to 1.
     """
-    # print(f"corpus:{corpus}")
+    graph = LinkGraph.from_corpus(corpus)
+    ranks, stats = power_iteration(graph, damping_factor, tolerance,
+                                   max_iterations)
+    return graph.ranks_by_page(ranks)
 
-    pages = list(corpus.keys())
-    page_rank_i = {k:1/len(pages) for k in pages} #initialization
-    
-    while(True):
-        page_rank_p = iterate_page(corpus, damping_factor, page_rank_i)
-        # print(f"page_rank_p:{page_rank_p}")
-        # print(f"sum: {sum(list(page_rank_p.values()))}")
-        diff = 0
-        for p in page_rank_p:
-            diff += abs(page_rank_p[p] - page_rank_i[p])
-        if diff < 0.001: #update is less than 0.001
-            break
-        page_rank_i = page_rank_p
-        
-    return page_rank_p
-    # raise NotImplementedError
 
 def iterate_page(corpus, damping_factor, page_rank):
-    page_p = {}
-    page_number = len(list(corpus.keys()))
-    
-    for page in page_rank:
-        pr_i = 0
-        page_key = [k for (k,v) in corpus.items() if page in v]
-        # print(f"page_key:{page_key}")
-        for p in page_key:
-            pr_i += page_rank[p]/len(corpus[p])
-        page_p[page] = (1-damping_factor)/page_number + \
-                    damping_factor * pr_i
-
-    return page_p
+    """
+    Return the PageRank values after one update of `page_rank`.
+    """
+    graph = LinkGraph.from_corpus(corpus)
+    ranks = [page_rank[page] for page in graph.pages]
+    return graph.ranks_by_page(rank_step(graph, damping_factor, ranks))
+
+
+class LinkGraph():
+    """
+    Link graph with pages interned to integer ids.
+    Incoming links are kept in compressed sparse (CSR) form: the pages
+    linking to page i are `sources[offsets[i]:offsets[i + 1]]`.
+    Outgoing links likewise are
+    `targets[target_offsets[i]:target_offsets[i + 1]]`.
+    """
+
+    def __init__(self, pages, src, dst):
+        """
+        Build the graph from a list of page names and two parallel
+        sequences of page ids, one link per `src[k]` -> `dst[k]`.
+        Duplicate links and self links are expected to be removed.
+        """
+        self.pages = list(pages)
+        self.index = {page: i for i, page in enumerate(self.pages)}
+        n = len(self.pages)
+
+        # Count links leaving and entering each page
+        self.outdegree = array.array("i", bytes(4 * n))
+        offsets = array.array("q", bytes(8 * (n + 1)))
+        for s, d in zip(src, dst):
+            self.outdegree[s] += 1
+            offsets[d + 1] += 1
+        for i in range(n):
+            offsets[i + 1] += offsets[i]
+
+        # Bucket every link by the page it points to
+        self.sources = array.array("i", bytes(4 * offsets[n]))
+        fill = array.array("q", offsets[:n])
+        for s, d in zip(src, dst):
+            self.sources[fill[d]] = s
+            fill[d] += 1
+        self.offsets = offsets
+
+        # Bucket every link by the page it comes from
+        target_offsets = array.array("q", bytes(8 * (n + 1)))
+        for i in range(n):
+            target_offsets[i + 1] = target_offsets[i] + self.outdegree[i]
+        self.targets = array.array("i", bytes(4 * target_offsets[n]))
+        fill = array.array("q", target_offsets[:n])
+        for s, d in zip(src, dst):
+            self.targets[fill[s]] = d
+            fill[s] += 1
+        self.target_offsets = target_offsets
+
+        # Pages without links behave as if they linked to every page
+        self.dangling = array.array(
+            "i", (i for i in range(n) if self.outdegree[i] == 0)
+        )
+
+    @classmethod
+    def from_corpus(cls, corpus):
+        """
+        Build the graph from a `crawl` dictionary of page -> linked pages.
+        """
+        pages = list(corpus)
+        index = {page: i for i, page in enumerate(pages)}
+        src = array.array("i")
+        dst = array.array("i")
+        for page, links in corpus.items():
+            s = index[page]
+            for link in links:
+                if link in index and link != page:
+                    src.append(s)
+                    dst.append(index[link])
+        return cls(pages, src, dst)
+
+    def __len__(self):
+        return len(self.pages)
+
+    def links_to(self, i):
+        """
+        Return the ids of the pages that link to page `i`.
+        """
+        return self.sources[self.offsets[i]:self.offsets[i + 1]]
+
+    def ranks_by_page(self, ranks):
+        """
+        Return a dictionary of page name -> rank for a list of ranks.
+        """
+        return dict(zip(self.pages, ranks))
+
+
+def rank_step(graph, damping_factor, ranks):
+    """
+    Return the list of PageRank values after one update of `ranks`.
+    The rank of dangling pages is spread evenly over all pages.
+    """
+    n = len(graph)
+    outdegree = graph.outdegree
+    sources = graph.sources
+    offsets = graph.offsets
+
+    # Share of rank each page passes along every one of its links
+    share = [r / d if d else 0.0 for r, d in zip(ranks, outdegree)]
+    get = share.__getitem__
+
+    dangling = sum(ranks[i] for i in graph.dangling)
+    base = (1 - damping_factor) / n + damping_factor * dangling / n
+    return [
+        base + damping_factor * sum(map(get, sources[offsets[i]:offsets[i + 1]]))
+        for i in range(n)
+    ]
+
+
+def gauss_seidel_step(graph, damping_factor, ranks):
+    """
+    Return the PageRank values after one Gauss-Seidel sweep over `ranks`:
+    pages are updated in id order, each one already using the new ranks
+    of the pages before it. The result is renormalized to sum to 1.
+    """
+    n = len(graph)
+    outdegree = graph.outdegree
+    sources = graph.sources
+    offsets = graph.offsets
+    ranks = list(ranks)
+    share = [r / d if d else 0.0 for r, d in zip(ranks, outdegree)]
+    get = share.__getitem__
+    dangling = sum(ranks[i] for i in graph.dangling)
+
+    for i in range(n):
+        rank = (1 - damping_factor) / n + damping_factor * dangling / n + \
+            damping_factor * sum(map(get, sources[offsets[i]:offsets[i + 1]]))
+        if outdegree[i]:
+            share[i] = rank / outdegree[i]
+        else:
+            dangling += rank - ranks[i]
+        ranks[i] = rank
+
+    total = sum(ranks)
+    return [r / total for r in ranks]
+
+
+def quadratic_extrapolation(ranks, previous, before, first):
+    """
+    Return the quadratic extrapolation (Kamvar et al.) of the last four
+    iterates `first`, `before`, `previous`, `ranks`: the ranks are taken
+    to be a combination of the stationary vector and the two next
+    eigenvectors of the update, whose contributions are estimated by
+    least squares from the differences of the iterates and removed.
+    The result is clipped to be non-negative and renormalized to sum
+    to 1; `ranks` is returned unchanged if the fit is degenerate.
+    """
+    y1 = [a - b for a, b in zip(before, first)]
+    y2 = [a - b for a, b in zip(previous, first)]
+    y3 = [a - b for a, b in zip(ranks, first)]
+    a11 = sum(a * a for a in y1)
+    a12 = sum(a * b for a, b in zip(y1, y2))
+    a22 = sum(b * b for b in y2)
+    b1 = -sum(a * c for a, c in zip(y1, y3))
+    b2 = -sum(b * c for b, c in zip(y2, y3))
+    determinant = a11 * a22 - a12 * a12
+    if abs(determinant) <= 1e-12 * a11 * a22:
+        return ranks
+
+    # Coefficients of the characteristic polynomial, then of the
+    # combination of the last three iterates
+    g1 = (b1 * a22 - b2 * a12) / determinant
+    g2 = (a11 * b2 - a12 * b1) / determinant
+    beta0 = g1 + g2 + 1
+    beta1 = g2 + 1
+    extrapolated = [max(beta0 * x0 + beta1 * x1 + x2, 0.0)
+                    for x0, x1, x2 in zip(before, previous, ranks)]
+    total = sum(extrapolated)
+    return [r / total for r in extrapolated] if total > 0 else ranks
+
+
+# Solvers accepted by `iterate_ranks`, `power_iteration` and
+# `compare_solvers`
+SOLVERS = ("power", "gauss-seidel", "extrapolated", "blocks")
+
+# Extrapolated iteration applies quadratic extrapolation this often
+EXTRAPOLATION_PERIOD = 10
+
+
+def iterate_ranks(graph, damping_factor, solver="power", tolerance=0.001,
+                  max_iterations=1000, ranks=None):
+    """
+    Update the ranks of `graph` from `ranks` (uniform by default) with
+    `solver`, one of SOLVERS, yielding a record after every iteration:
+        * "iteration": number of updates so far,
+        * "residual": L1 change of this update,
+        * "max_change": largest change of a single page's rank,
+        * "changed": number of pages whose rank moved by more than
+          `tolerance / n`,
+        * "step_seconds" and "seconds": time of this update, and
+          time since the first one,
+        * "ranks": the list of ranks after this update.
+    Stops once the residual falls below `tolerance`, or after
+    `max_iterations` updates. The "blocks" solver runs `block_pagerank`
+    to the end and yields a single record, its "iteration" counting
+    sweeps over the whole graph and its changes taken from `ranks`.
+    """
+    if solver not in SOLVERS:
+        raise ValueError(f"Unknown solver: {solver}")
+    n = len(graph)
+    if ranks is None:
+        ranks = [1 / n] * n
+    threshold = tolerance / n
+    history = []
+
+    if solver == "blocks":
+        new_ranks, stats = block_pagerank(graph, damping_factor, tolerance,
+                                          max_iterations, ranks=ranks)
+        changes = [abs(a - b) for a, b in zip(new_ranks, ranks)]
+        yield {
+            "iteration": stats["iterations"],
+            "residual": stats["residual"],
+            "max_change": max(changes, default=0.0),
+            "changed": sum(1 for c in changes if c > threshold),
+            "step_seconds": stats["seconds"],
+            "seconds": stats["seconds"],
+            "ranks": new_ranks
+        }
+        return
+
+    start = time.perf_counter()
+    iteration = 0
+    while iteration < max_iterations:
+        step_start = time.perf_counter()
+        if solver == "gauss-seidel":
+            new_ranks = gauss_seidel_step(graph, damping_factor, ranks)
+        else:
+            new_ranks = rank_step(graph, damping_factor, ranks)
+        iteration += 1
+        if solver == "extrapolated":
+            history = (history + [ranks])[-3:]
+            if iteration % EXTRAPOLATION_PERIOD == 0 and len(history) == 3:
+                new_ranks = quadratic_extrapolation(new_ranks,
+                                                    *reversed(history))
+
+        changes = [abs(a - b) for a, b in zip(new_ranks, ranks)]
+        ranks = new_ranks
+        now = time.perf_counter()
+        residual = sum(changes)
+        yield {
+            "iteration": iteration,
+            "residual": residual,
+            "max_change": max(changes, default=0.0),
+            "changed": sum(1 for c in changes if c > threshold),
+            "step_seconds": now - step_start,
+            "seconds": now - start,
+            "ranks": ranks
+        }
+        if residual < tolerance: #update is less than tolerance
+            break
+
+
+def power_iteration(graph, damping_factor, tolerance=0.001,
+                    max_iterations=1000, ranks=None, solver="power",
+                    callback=None):
+    """
+    Run `solver` (power iteration by default) on `graph` from `ranks`
+    (uniform by default) until the L1 change of an update falls below
+    `tolerance`, or for at most `max_iterations` updates. `callback`,
+    if given, is called with every record from `iterate_ranks`.
+
+    Return `(ranks, stats)` where `ranks` is a list indexed by page id
+    and `stats` holds "iterations", "residual" and "seconds".
+    """
+    n = len(graph)
+    stats = {"iterations": 0, "residual": float("inf"), "seconds": 0.0}
+    if ranks is None:
+        ranks = [1 / n] * n
+    for record in iterate_ranks(graph, damping_factor, solver, tolerance,
+                                max_iterations, ranks):
+        if callback is not None:
+            callback(record)
+        ranks = record["ranks"]
+        stats = {
+            "iterations": record["iteration"],
+            "residual": record["residual"],
+            "seconds": record["seconds"]
+        }
+    return ranks, stats
+
+
+def strongly_connected_components(graph):
+    """
+    Return the strongly connected components of `graph` as arrays of
+    page ids, in topological order: every link between two components
+    goes from an earlier one to a later one.
+    """
+    n = len(graph)
+    targets = graph.targets
+    target_offsets = graph.target_offsets
+    index = array.array("i", [-1]) * n
+    low = array.array("i", bytes(4 * n))
+    on_stack = bytearray(n)
+    stack = []
+    components = []
+    counter = 0
+
+    # Iterative Tarjan: each frame is a page and its next link to follow
+    for root in range(n):
+        if index[root] != -1:
+            continue
+        frames = [[root, target_offsets[root]]]
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = 1
+        while frames:
+            frame = frames[-1]
+            i, k = frame
+            if k < target_offsets[i + 1]:
+                frame[1] += 1
+                j = targets[k]
+                if index[j] == -1:
+                    index[j] = low[j] = counter
+                    counter += 1
+                    stack.append(j)
+                    on_stack[j] = 1
+                    frames.append([j, target_offsets[j]])
+                elif on_stack[j] and index[j] < low[i]:
+                    low[i] = index[j]
+                continue
+            frames.pop()
+            if frames and low[i] < low[frames[-1][0]]:
+                low[frames[-1][0]] = low[i]
+            if low[i] == index[i]:
+                component = array.array("i")
+                while True:
+                    j = stack.pop()
+                    on_stack[j] = 0
+                    component.append(j)
+                    if j == i:
+                        break
+                components.append(component)
+
+    # Tarjan finds every component after all those it links to
+    components.reverse()
+    return components
+
+
+def block_pagerank(graph, damping_factor, tolerance=0.001,
+                   max_iterations=1000, callback=None, ranks=None):
+    """
+    Solve PageRank one strongly connected component at a time, in
+    topological order, so every block only iterates once the ranks
+    flowing into it from earlier blocks are final.
+
+    Blocks solve the linear system x = (1 - d) / n + d * A x, starting
+    from `ranks` (uniform by default), where A
+    leaves out the links of dangling pages; their mass is restored
+    explicitly by normalizing x to sum to 1, which gives the same ranks
+    as spreading it evenly over all pages. Each block runs Gauss-Seidel
+    sweeps until its L1 change is below its share of `tolerance`, for at
+    most `max_iterations` sweeps; single pages need just one update.
+    After every sweep a block is rescaled so that its total rank equals
+    its inflow plus the rank its own links keep inside it, which plays
+    the part of the normalization step of power iteration.
+    `callback`, if given, is called with a record per block holding
+    "block", "size", "iterations", "residual" and "seconds".
+
+    Return `(ranks, stats)` like `power_iteration`; stats also holds
+    "blocks", "iterations" counts sweeps over the whole graph (the page
+    updates made, divided by the number of pages), and "residual" is
+    the L1 change of one more `rank_step` from the final ranks.
+    """
+    start = time.perf_counter()
+    n = len(graph)
+    outdegree = graph.outdegree
+    sources = graph.sources
+    offsets = graph.offsets
+    targets = graph.targets
+    target_offsets = graph.target_offsets
+    components = strongly_connected_components(graph)
+    block_of = array.array("i", bytes(4 * n))
+    for block, component in enumerate(components):
+        for i in component:
+            block_of[i] = block
+
+    base = (1 - damping_factor) / n
+    x = [1 / n] * n if ranks is None else list(ranks)
+    share = [r / d if d else 0.0 for r, d in zip(x, outdegree)]
+    get = share.__getitem__
+    updates = 0
+
+    for block, component in enumerate(components):
+        block_start = time.perf_counter()
+        block_tolerance = tolerance * len(component) / n
+
+        # Rank entering the block, and the share of every page's links
+        # that stay inside it
+        if len(component) > 1:
+            inflow = base * len(component)
+            kept = []
+            for i in component:
+                inflow += damping_factor * sum(
+                    share[j] for j in sources[offsets[i]:offsets[i + 1]]
+                    if block_of[j] != block)
+                links = targets[target_offsets[i]:target_offsets[i + 1]]
+                kept.append(sum(1 for j in links if block_of[j] == block) /
+                            outdegree[i] if outdegree[i] else 0.0)
+
+        iterations = 0
+        while iterations < max_iterations:
+            change = 0.0
+            for i in component:
+                rank = base + damping_factor * sum(
+                    map(get, sources[offsets[i]:offsets[i + 1]]))
+                change += abs(rank - x[i])
+                x[i] = rank
+                if outdegree[i]:
+                    share[i] = rank / outdegree[i]
+            iterations += 1
+            updates += len(component)
+            if len(component) == 1 or change < block_tolerance:
+                break
+            total = sum(x[i] for i in component)
+            inside = sum(x[i] * k for i, k in zip(component, kept))
+            scale = inflow / (total - damping_factor * inside)
+            for i in component:
+                x[i] *= scale
+                if outdegree[i]:
+                    share[i] = x[i] / outdegree[i]
+
+        if callback is not None:
+            callback({
+                "block": block,
+                "size": len(component),
+                "iterations": iterations,
+                "residual": change,
+                "seconds": time.perf_counter() - block_start
+            })
+
+    total = sum(x)
+    ranks = [r / total for r in x] if total else x
+    residual = sum(abs(a - b) for a, b in
+                   zip(rank_step(graph, damping_factor, ranks), ranks))
+    return ranks, {
+        "iterations": updates / n if n else 0,
+        "residual": residual,
+        "seconds": time.perf_counter() - start,
+        "blocks": len(components)
+    }
+
+
+def without_ranks(record):
+    """
+    Return a copy of an iteration record without its "ranks".
+    """
+    return {k: v for k, v in record.items() if k != "ranks"}
+
+
+def export_diagnostics(records, filename):
+    """
+    Write iteration records (without their ranks) to `filename`,
+    as JSON if it ends with ".json" and as CSV otherwise.
+    Records may come from several solvers if they carry a "solver" key.
+    """
+    rows = [without_ranks(record) for record in records]
+    with open(filename, "w", newline="") as f:
+        if filename.endswith(".json"):
+            json.dump(rows, f, indent=2)
+        else:
+            fields = []
+            for row in rows:
+                fields.extend(k for k in row if k not in fields)
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+def compare_solvers(graph, damping_factor, solvers=SOLVERS, tolerance=0.001,
+                    max_iterations=1000):
+    """
+    Run every solver in `solvers` on `graph` and return all their
+    iteration records, without their ranks, each tagged with its
+    "solver".
+    """
+    records = []
+    for solver in solvers:
+        for record in iterate_ranks(graph, damping_factor, solver, tolerance,
+                                    max_iterations):
+            records.append(dict(without_ranks(record), solver=solver))
+    return records
 
 
 if __name__ == "__main__":
@@ -0,0 +1,271 @@
+"""
+Project 2
+CS50's Introduction to Artificial Intelligence with Python
+https://cs50.harvard.edu/ai/2023/
+
+Attempted by
+Daychyi Ku
+https://github.com/Daychyi
+
+Out-of-core PageRank: the link graph is kept on disk as a sorted binary
+edge file and the rank vectors as memory-mapped files, so only blocks
+bounded by a memory budget are ever held in memory.
+"""
+
+import array
+import heapq
+import json
+import mmap
+import os
+import sys
+import time
+
+from pagerank import DAMPING, corpus_pages, edge_batches
+
+# Default memory budget in bytes
+MEMORY = 64 << 20
+
+
+def main():
+    if len(sys.argv) not in (3, 4):
+        sys.exit("Usage: python pagerank_disk.py corpus directory [memory_mb]")
+    memory = int(sys.argv[3]) << 20 if len(sys.argv) == 4 else MEMORY
+    # Links are parsed batch by batch as the external sort consumes them
+    pages = corpus_pages(sys.argv[1])
+    edges = (
+        edge for src, dst in edge_batches(sys.argv[1], pages)
+        for edge in zip(src, dst)
+    )
+    graph = DiskGraph.build(sys.argv[2], pages, edges, memory)
+    stats = disk_pagerank(graph, DAMPING, memory=memory)
+    print(f"PageRank Results from Iteration on disk "
+          f"({stats['iterations']} iterations, {stats['seconds']:.4f}s)")
+    with graph.open_ranks() as ranks:
+        for page, rank in sorted(zip(graph.pages(), ranks)):
+            print(f"  {page}: {rank:.4f}")
+
+
+class MappedArray():
+    """
+    A file of fixed-size numbers, memory-mapped and exposed as a
+    memoryview of `typecode` ("q", "i" or "d"). Use as a context manager.
+    """
+
+    def __init__(self, filename, typecode, length=None):
+        """
+        Map `filename`, first creating it with `length` zeros if given.
+        """
+        size = array.array(typecode).itemsize
+        if length is not None:
+            with open(filename, "wb") as f:
+                f.truncate(length * size)
+        self.file = open(filename, "r+b")
+        if os.fstat(self.file.fileno()).st_size == 0:
+            self.map = None
+            self.view = memoryview(array.array(typecode))
+        else:
+            self.map = mmap.mmap(self.file.fileno(), 0)
+            self.view = memoryview(self.map).cast("B").cast(typecode)
+
+    def __enter__(self):
+        return self.view
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.view.release()
+        if self.map is not None:
+            self.map.close()
+        self.file.close()
+
+
+class DiskGraph():
+    """
+    Link graph stored in `directory`:
+        * "edges.bin": one 64-bit key `dst << 32 | src` per link,
+          sorted so links are grouped by the page they point to,
+        * "outdegree.bin": 32-bit number of links leaving each page,
+        * "pages.txt": page names, one per line, in id order,
+        * "graph.json": number of pages and links,
+        * "ranks.bin": 64-bit float rank of each page, once computed.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(self.path("graph.json")) as f:
+            meta = json.load(f)
+        self.n = meta["pages"]
+        self.edges = meta["edges"]
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def __len__(self):
+        return self.n
+
+    def pages(self):
+        """
+        Yield page names in id order.
+        """
+        with open(self.path("pages.txt"), encoding="utf-8") as f:
+            for line in f:
+                yield line.rstrip("\n")
+
+    def open_ranks(self):
+        return MappedArray(self.path("ranks.bin"), "d")
+
+    @classmethod
+    def build(cls, directory, pages, edges, memory=MEMORY):
+        """
+        Write the graph of `pages` (names, in id order) and `edges`
+        (an iterable of `(src, dst)` id pairs) to `directory`.
+        Edges are sorted externally: runs of at most `memory` bytes
+        are sorted in memory, spilled to disk, then merged.
+        """
+        os.makedirs(directory, exist_ok=True)
+        n = 0
+        with open(os.path.join(directory, "pages.txt"), "w",
+                  encoding="utf-8") as f:
+            for page in pages:
+                f.write(page + "\n")
+                n += 1
+
+        # A sorted list costs about 40 bytes per key
+        run_size = max(1024, memory // 40)
+        runs = []
+        count = 0
+        with MappedArray(os.path.join(directory, "outdegree.bin"), "i",
+                         n) as outdegree:
+            run = []
+            for s, d in edges:
+                outdegree[s] += 1
+                run.append(d << 32 | s)
+                count += 1
+                if len(run) == run_size:
+                    runs.append(cls._write_run(directory, len(runs), run))
+                    run = []
+            if run or not runs:
+                runs.append(cls._write_run(directory, len(runs), run))
+
+        # Merge runs, each read in blocks sharing the budget
+        block = max(1024, memory // (8 * (len(runs) + 1)))
+        with open(os.path.join(directory, "edges.bin"), "wb") as out:
+            merged = heapq.merge(*(_read_keys(run, block) for run in runs))
+            buffer = array.array("q")
+            for key in merged:
+                buffer.append(key)
+                if len(buffer) == block:
+                    buffer.tofile(out)
+                    buffer = array.array("q")
+            buffer.tofile(out)
+        for run in runs:
+            os.remove(run)
+
+        with open(os.path.join(directory, "graph.json"), "w") as f:
+            json.dump({"pages": n, "edges": count}, f)
+        return cls(directory)
+
+    @staticmethod
+    def _write_run(directory, number, keys):
+        filename = os.path.join(directory, f"run{number}.bin")
+        with open(filename, "wb") as f:
+            array.array("q", sorted(keys)).tofile(f)
+        return filename
+
+
+def _read_keys(filename, block):
+    """
+    Yield the 64-bit keys of `filename`, reading `block` at a time.
+    """
+    with open(filename, "rb") as f:
+        while True:
+            keys = array.array("q")
+            keys.frombytes(f.read(8 * block))
+            if not keys:
+                return
+            yield from keys
+
+
+def disk_pagerank(graph, damping_factor, tolerance=0.001, max_iterations=1000,
+                  memory=MEMORY):
+    """
+    Run power iteration over `graph` with rank vectors memory-mapped
+    from disk, streaming the edge file in blocks of at most `memory`
+    bytes. Rank of pages without links is spread evenly over all pages.
+    Ranks are left in the graph's "ranks.bin".
+
+    Return stats with "iterations", "residual" and "seconds".
+    """
+    start = time.perf_counter()
+    n = len(graph)
+    block = max(1024, memory // 16)
+    names = ("ranks.bin", "next.bin", "share.bin")
+    vectors = [MappedArray(graph.path(name), "d", n) for name in names]
+    edges = MappedArray(graph.path("edges.bin"), "q")
+    outdegree = MappedArray(graph.path("outdegree.bin"), "i")
+    ranks, new_ranks, share = (vector.view for vector in vectors)
+
+    try:
+        for lo in range(0, n, block):
+            hi = min(lo + block, n)
+            ranks[lo:hi] = array.array("d", [1 / n]) * (hi - lo)
+
+        iterations = 0
+        residual = float("inf")
+        while iterations < max_iterations:
+
+            # Share passed along each link, and rank of dangling pages
+            dangling = 0.0
+            for lo in range(0, n, block):
+                hi = min(lo + block, n)
+                part = []
+                for r, d in zip(ranks[lo:hi], outdegree.view[lo:hi]):
+                    if d:
+                        part.append(r / d)
+                    else:
+                        part.append(0.0)
+                        dangling += r
+                share[lo:hi] = array.array("d", part)
+
+            base = (1 - damping_factor) / n + damping_factor * dangling / n
+            for lo in range(0, n, block):
+                hi = min(lo + block, n)
+                new_ranks[lo:hi] = array.array("d", [base]) * (hi - lo)
+
+            # Stream links grouped by destination
+            for lo in range(0, graph.edges, block):
+                for key in edges.view[lo:min(lo + block, graph.edges)]:
+                    new_ranks[key >> 32] += damping_factor * share[key & 0xFFFFFFFF]
+
+            residual = 0.0
+            for lo in range(0, n, block):
+                hi = min(lo + block, n)
+                residual += sum(abs(a - b) for a, b in
+                                zip(new_ranks[lo:hi], ranks[lo:hi]))
+            iterations += 1
+
+            # Copy back so "ranks.bin" always holds the latest ranks
+            for lo in range(0, n, block):
+                hi = min(lo + block, n)
+                ranks[lo:hi] = new_ranks[lo:hi]
+            if residual < tolerance: #update is less than tolerance
+                break
+    finally:
+        del ranks, new_ranks, share
+        for vector in vectors:
+            vector.close()
+        edges.close()
+        outdegree.close()
+        os.remove(graph.path("next.bin"))
+        os.remove(graph.path("share.bin"))
+
+    return {
+        "iterations": iterations,
+        "residual": residual,
+        "seconds": time.perf_counter() - start
+    }
+
+
+if __name__ == "__main__":
+    main()
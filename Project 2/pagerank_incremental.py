@@ -0,0 +1,223 @@
+"""
+Project 2
+CS50's Introduction to Artificial Intelligence with Python
+https://cs50.harvard.edu/ai/2023/
+
+Attempted by
+Daychyi Ku
+https://github.com/Daychyi
+
+Incremental PageRank: keeps the link graph and last ranks of a corpus
+on disk, and after an edit only re-reads the changed HTML files and
+warm-starts iteration from the previous ranks.
+"""
+
+import hashlib
+import os
+import pickle
+import sys
+import time
+
+from pagerank import DAMPING, LINK_PATTERN, LinkGraph, power_iteration, \
+    rank_step
+
+STATE_FILE = ".pagerank.pickle"
+
+
+def main():
+    if len(sys.argv) not in (2, 3) or \
+            (len(sys.argv) == 3 and sys.argv[2] != "--push"):
+        sys.exit("Usage: python pagerank_incremental.py corpus [--push]")
+    directory = sys.argv[1]
+    ranks, stats = refresh(directory, os.path.join(directory, STATE_FILE),
+                           DAMPING, push=len(sys.argv) == 3)
+    print(f"{stats['changed']} changed, {stats['removed']} removed "
+          f"of {stats['pages']} pages")
+    print(f"Refreshed in {stats['seconds']:.4f}s "
+          f"(scan {stats['scan_seconds']:.4f}s, "
+          f"rank {stats['rank_seconds']:.4f}s, "
+          f"{stats['iterations']} iterations)")
+    for page in sorted(ranks):
+        print(f"  {page}: {ranks[page]:.4f}")
+
+
+def file_hash(path):
+    """
+    Return the SHA-1 digest of the file at `path`.
+    """
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def page_links(path, page):
+    """
+    Return the set of every page named by a link in the file at `path`,
+    whether or not it is part of the corpus, excluding `page` itself.
+    """
+    with open(path, "rb") as f:
+        found = LINK_PATTERN.findall(f.read())
+    return {link.decode("utf-8", "replace") for link in found} - {page}
+
+
+def load_state(state_path):
+    """
+    Return the state saved at `state_path`, or an empty state.
+    The state holds, per page, its file signature `(mtime_ns, size, hash)`
+    and raw links, plus the ranks of the last refresh.
+    """
+    try:
+        with open(state_path, "rb") as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        return {"files": {}, "links": {}, "ranks": {}, "damping": None}
+
+
+def save_state(state_path, state):
+    """
+    Atomically write `state` to `state_path`.
+    """
+    temp = state_path + ".tmp"
+    with open(temp, "wb") as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp, state_path)
+
+
+def refresh(directory, state_path, damping_factor, tolerance=0.001,
+            push=False):
+    """
+    Bring the ranks of the corpus in `directory` up to date with the
+    state saved at `state_path`, then save the new state.
+
+    A file is re-read only if its mtime or size changed and its hash
+    differs from the saved one. Iteration warm-starts from the saved
+    ranks; with `push`, residuals are first pushed out locally from
+    the pages whose links changed, or whose in-links did, before
+    iterating over the whole graph.
+
+    Return `(ranks, stats)`, with ranks as a page -> rank dictionary.
+    """
+    start = time.perf_counter()
+    state = load_state(state_path)
+    files = state["files"]
+    links = state["links"]
+
+    # Find new, edited and deleted pages
+    changed = 0
+    present = set()
+    touched = set()
+    for entry in os.scandir(directory):
+        if not entry.name.endswith(".html") or not entry.is_file():
+            continue
+        page = entry.name
+        present.add(page)
+        info = entry.stat()
+        old = files.get(page)
+        if old is not None and old[:2] == (info.st_mtime_ns, info.st_size):
+            continue
+        digest = file_hash(entry.path)
+        files[page] = (info.st_mtime_ns, info.st_size, digest)
+        if old is not None and old[2] == digest:
+            continue
+        touched.add(page)
+        touched.update(links.get(page, ()))
+        links[page] = page_links(entry.path, page)
+        touched.update(links[page])
+        changed += 1
+    removed = set(files) - present
+    for page in removed:
+        touched.update(links[page])
+        del files[page]
+        del links[page]
+    scan_seconds = time.perf_counter() - start
+
+    # Rank from the previous ranks, spreading what is missing evenly
+    rank_start = time.perf_counter()
+    previous = state["ranks"] if state["damping"] == damping_factor else {}
+    iterations = 0
+    if changed or removed or len(previous) != len(files):
+        graph = LinkGraph.from_corpus(links)
+        n = len(graph)
+        ranks = [previous.get(page, 0.0) for page in graph.pages]
+        missing = (1 - sum(ranks)) / n if n else 0.0
+        ranks = [r + missing for r in ranks]
+        if n:
+            if push:
+                seeds = [graph.index[page] for page in touched
+                         if page in graph.index] if previous else None
+                ranks = push_update(graph, damping_factor, ranks, tolerance,
+                                    seeds)
+            ranks, stats = power_iteration(graph, damping_factor, tolerance,
+                                           ranks=ranks)
+            iterations = stats["iterations"]
+        state["ranks"] = graph.ranks_by_page(ranks)
+        state["damping"] = damping_factor
+    rank_seconds = time.perf_counter() - rank_start
+    save_state(state_path, state)
+
+    return state["ranks"], {
+        "pages": len(files),
+        "changed": changed,
+        "removed": len(removed),
+        "iterations": iterations,
+        "scan_seconds": scan_seconds,
+        "rank_seconds": rank_seconds,
+        "seconds": time.perf_counter() - start
+    }
+
+
+def push_update(graph, damping_factor, ranks, tolerance, seeds=None):
+    """
+    Return `ranks` improved by local pushes: the residual of a page
+    (its next rank minus its current rank) is moved into its rank and
+    passed on along its links, starting from the page indices in `seeds`
+    (every page if None) and only touching pages whose residual is still
+    above `(1 - damping_factor) * tolerance / n`.
+
+    Residual pushed from pages without links is owed evenly to every
+    page, so it is kept as one uniform term; once no page is left above
+    the threshold, that term is added to every page's residual and
+    pushed in turn, until it is below the threshold too.
+    """
+    n = len(graph)
+    ranks = list(ranks)
+    residual = [a - b for a, b in
+                zip(rank_step(graph, damping_factor, ranks), ranks)]
+    threshold = (1 - damping_factor) * tolerance / n
+    targets = graph.targets
+    offsets = graph.target_offsets
+    outdegree = graph.outdegree
+
+    queue = [i for i in (range(n) if seeds is None else seeds)
+             if abs(residual[i]) > threshold]
+    queued = set(queue)
+    uniform = 0.0
+    while queue:
+        while queue:
+            i = queue.pop()
+            queued.discard(i)
+            r = residual[i]
+            residual[i] = 0.0
+            ranks[i] += r
+            if outdegree[i] == 0:
+                uniform += damping_factor * r / n
+                continue
+            share = damping_factor * r / outdegree[i]
+            for k in range(offsets[i], offsets[i + 1]):
+                j = targets[k]
+                residual[j] += share
+                if abs(residual[j]) > threshold and j not in queued:
+                    queued.add(j)
+                    queue.append(j)
+        if abs(uniform) > threshold:
+            residual = [r + uniform for r in residual]
+            uniform = 0.0
+            queue = [i for i in range(n) if abs(residual[i]) > threshold]
+            queued = set(queue)
+    return ranks
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Project 2
+CS50's Introduction to Artificial Intelligence with Python
+https://cs50.harvard.edu/ai/2023/
+
+Attempted by
+Daychyi Ku
+https://github.com/Daychyi
+
+Personalized PageRank: the random surfer teleports to a set of seed
+pages instead of any page. Queries are answered by local push over a
+preloaded link graph, with recent results kept in a cache.
+"""
+
+import pickle
+import sys
+import time
+from collections import OrderedDict, deque
+
+from pagerank import DAMPING, LinkGraph, crawl_edges
+
+TOP = 10
+
+
+def main():
+    if len(sys.argv) < 3:
+        sys.exit("Usage: python pagerank_personal.py corpus page [page ...]")
+    ranker = PersonalizedRanker(LinkGraph(*crawl_edges(sys.argv[1])), DAMPING)
+    start = time.perf_counter()
+    ranks = ranker.query(sys.argv[2:])
+    seconds = time.perf_counter() - start
+    print(f"Personalized PageRank for {', '.join(sys.argv[2:])} "
+          f"({len(ranks)} pages touched, {seconds:.4f}s)")
+    for page, rank in top_pages(ranks, TOP):
+        print(f"  {page}: {rank:.4f}")
+
+
+def top_pages(ranks, k):
+    """
+    Return the `k` highest ranked `(page, rank)` pairs of `ranks`.
+    """
+    return sorted(ranks.items(), key=lambda item: (-item[1], item[0]))[:k]
+
+
+class PersonalizedRanker():
+    """
+    Answers personalized PageRank queries for seed sets of pages
+    over one link graph, caching the results of recent seed sets.
+    """
+
+    def __init__(self, graph, damping_factor, epsilon=1e-6, cache_size=128):
+        self.graph = graph
+        self.damping_factor = damping_factor
+        self.epsilon = epsilon
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+
+    @classmethod
+    def load(cls, filename, **options):
+        """
+        Return a ranker over the graph saved at `filename` by `save`.
+        """
+        with open(filename, "rb") as f:
+            graph, damping_factor = pickle.load(f)
+        return cls(graph, damping_factor, **options)
+
+    def save(self, filename):
+        """
+        Save the graph and damping factor to `filename`, so later
+        processes can load them without crawling the corpus again.
+        """
+        with open(filename, "wb") as f:
+            pickle.dump((self.graph, self.damping_factor), f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+
+    def query(self, seeds, epsilon=None):
+        """
+        Return the personalized PageRank of every page reached from
+        the pages in `seeds`, teleporting uniformly back to the seeds,
+        as a page -> rank dictionary. Pages never reached are omitted,
+        their rank being 0. Results are cached per seed set, and every
+        call returns its own copy.
+        Raises ValueError if `seeds` is empty.
+        """
+        epsilon = self.epsilon if epsilon is None else epsilon
+        key = (frozenset(seeds), epsilon)
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            return dict(self.cache[key])
+
+        index = self.graph.index
+        unknown = [page for page in key[0] if page not in index]
+        if unknown:
+            raise KeyError(f"Pages not in corpus: {', '.join(sorted(unknown))}")
+        ranks = push_pagerank(self.graph, self.damping_factor,
+                              sorted(index[page] for page in key[0]), epsilon)
+        result = {self.graph.pages[i]: r for i, r in ranks.items()}
+
+        self.cache[key] = result
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return dict(result)
+
+
+def push_pagerank(graph, damping_factor, seeds, epsilon):
+    """
+    Approximate personalized PageRank for the page ids in `seeds` by
+    forward push: residual mass starts on the seeds, and any page
+    holding more than `epsilon` residual per outgoing link keeps
+    `1 - damping_factor` of it as rank and pushes the rest along its
+    links. Pages without links push their share back to the seeds.
+    Only pages reached by a push are touched.
+
+    Return a dictionary of page id -> rank, normalized to sum to 1.
+    Raises ValueError if `seeds` is empty.
+    """
+    if not seeds:
+        raise ValueError("No seed pages")
+    targets = graph.targets
+    offsets = graph.target_offsets
+    outdegree = graph.outdegree
+    teleport = 1 / len(seeds)
+
+    ranks = {}
+    residual = {i: teleport for i in seeds}
+    queue = deque(seeds)
+    queued = set(queue)
+    while queue:
+        i = queue.popleft()
+        queued.discard(i)
+        r = residual.pop(i, 0.0)
+        ranks[i] = ranks.get(i, 0.0) + (1 - damping_factor) * r
+        links = outdegree[i]
+        if links:
+            share = damping_factor * r / links
+            pushed = targets[offsets[i]:offsets[i + 1]]
+        else:
+            share = damping_factor * r * teleport
+            pushed = seeds
+        for j in pushed:
+            residual[j] = residual.get(j, 0.0) + share
+            if j not in queued and residual[j] > epsilon * max(outdegree[j], 1):
+                queued.add(j)
+                queue.append(j)
+
+    total = sum(ranks.values())
+    return {i: r / total for i, r in ranks.items()}
+
+
+if __name__ == "__main__":
+    main()
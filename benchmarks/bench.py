@@ -0,0 +1,476 @@
+"""
+Benchmarks for the hot paths of every project:
+    degrees.shortest_path/shortest_path_by_movie (optionally by year),
+    tictactoe.max_alpha_beta, MinesweeperAI.add_knowledge/add_knowledge_batch,
+    logic.model_check/BDD compilation (puzzle),
+    heredity.joint_probability/JunctionTree.query/sweep,
+    pagerank.iterate_pagerank/block_pagerank/sample_pagerank
+
+Each benchmark runs on seeded synthetic data at the chosen scale and
+records its best wall time, peak traced memory and the number of calls
+of the function doing the work. Results can be saved as JSON, compared
+against a saved baseline, and profiled with cProfile.
+
+Usage: python benchmarks/bench.py [--scale small|medium|large]
+           [--only name ...] [--repeat n] [--save results.json]
+           [--baseline results.json [--threshold 1.25]] [--profile dir]
+"""
+
+import argparse
+import cProfile
+import json
+import os
+import platform
+import pstats
+import random
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for project in ("Project 0", "Project 1", "Project 2"):
+    sys.path.insert(0, os.path.join(ROOT, project))
+
+SCALES = ("small", "medium", "large")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run project benchmarks.")
+    parser.add_argument("--scale", choices=SCALES, default="small")
+    parser.add_argument("--only", nargs="+", metavar="NAME",
+                        help="run only these benchmarks")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="timed runs per benchmark, best is kept")
+    parser.add_argument("--save", metavar="FILE",
+                        help="write results to this JSON file")
+    parser.add_argument("--baseline", metavar="FILE",
+                        help="compare against results saved earlier")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="slowdown ratio reported as a regression")
+    parser.add_argument("--profile", metavar="DIR",
+                        help="write a cProfile .prof file per benchmark")
+    args = parser.parse_args()
+
+    level = SCALES.index(args.scale)
+    names = args.only or list(BENCHMARKS)
+    unknown = set(names) - set(BENCHMARKS)
+    if unknown:
+        sys.exit(f"Unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    results = {}
+    for name in names:
+        try:
+            result = run_benchmark(name, level, args.repeat, args.profile)
+        except ImportError as e:
+            print(f"{name:<24} skipped ({e})")
+            continue
+        results[name] = result
+        print(f"{name:<24} {result['seconds']:>10.4f}s "
+              f"{result['peak_bytes'] / 1024:>10.0f} KiB "
+              f"{result['operations']:>10} x {result['counted']}")
+
+    report = {
+        "meta": {
+            "scale": args.scale,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S")
+        },
+        "results": results
+    }
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, report, args.threshold)
+        if regressions:
+            sys.exit(f"{len(regressions)} regression(s): "
+                     f"{', '.join(regressions)}")
+
+
+def run_benchmark(name, level, repeat, profile_dir=None):
+    """
+    Set up benchmark `name` at scale `level` and return its result:
+    best "seconds" of `repeat` runs, "peak_bytes" of traced memory,
+    and "operations", the number of calls of the "counted" function.
+    """
+    run, counted = BENCHMARKS[name](level)
+
+    best = float("inf")
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    profiler = cProfile.Profile()
+    profiler.runcall(run)
+    stats = pstats.Stats(profiler)
+    code = counted.__code__
+    key = (code.co_filename, code.co_firstlineno, code.co_name)
+    operations = stats.stats[key][1] if key in stats.stats else 0
+    if profile_dir:
+        os.makedirs(profile_dir, exist_ok=True)
+        stats.dump_stats(os.path.join(profile_dir, f"{name}.prof"))
+
+    return {
+        "seconds": best,
+        "peak_bytes": peak,
+        "operations": operations,
+        "counted": counted.__qualname__
+    }
+
+
+def compare(baseline, report, threshold):
+    """
+    Print the time ratio of every benchmark in both reports and
+    return the names of those slower than `threshold` times baseline.
+    """
+    if baseline["meta"]["scale"] != report["meta"]["scale"]:
+        print(f"Warning: baseline scale is {baseline['meta']['scale']}")
+    regressions = []
+    for name, result in report["results"].items():
+        if name not in baseline["results"]:
+            continue
+        old = baseline["results"][name]
+        ratio = result["seconds"] / old["seconds"] if old["seconds"] else 1.0
+        flag = ""
+        if ratio > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:<24} {ratio:>6.2f}x time, "
+              f"{result['operations'] - old['operations']:+} operations{flag}")
+    return regressions
+
+
+# Synthetic data generators
+
+def costar_graph(degrees, people, movies, cast, seed=0):
+    """
+    Fill the `degrees` module's people, movies and names with a random
+    co-star graph where popular people appear in more movies: half of
+    every cast is drawn from a heavy tail of low ids, the other half
+    from all ids.
+    """
+    rng = random.Random(seed)
+    degrees.people.clear()
+    degrees.movies.clear()
+    degrees.names.clear()
+    for i in range(people):
+        person_id = str(i)
+        name = f"person {i}"
+        degrees.people[person_id] = {"name": name, "birth": "",
+                                     "movies": set()}
+        degrees.names.setdefault(name, set()).add(person_id)
+    for m in range(movies):
+        movie_id = f"m{m}"
+        stars = {str(min(people - 1, int(rng.paretovariate(0.7)) - 1)
+                     if rng.random() < 0.5 else rng.randrange(people))
+                 for _ in range(cast)}
+        degrees.movies[movie_id] = {"title": movie_id,
+                                    "year": str(1950 + rng.randrange(70)),
+                                    "stars": stars}
+        for person_id in stars:
+            degrees.people[person_id]["movies"].add(movie_id)
+    degrees.build_year_index()
+
+
+def costar_pairs(degrees, count, years=None, seed=1):
+    """
+    Return `count` random (source, target) pairs of people who
+    starred in at least one movie of the `degrees` module, released
+    within the inclusive `(first, last)` range of `years` if given.
+    """
+    rng = random.Random(seed)
+    cast = sorted((person_id for person_id in degrees.people
+                   if degrees.movies_for_person(person_id, years)), key=int)
+    return [(rng.choice(cast), rng.choice(cast)) for _ in range(count)]
+
+
+def tictactoe_board(ttt, filled, seed=0):
+    """
+    Return a board with `filled` random legal moves already played
+    and no winner yet.
+    """
+    rng = random.Random(seed)
+    while True:
+        board = ttt.initial_state()
+        for _ in range(filled):
+            board = ttt.result(board, rng.choice(ttt.actions(board)))
+        if not ttt.terminal(board):
+            return board
+
+
+def pedigree(size, seed=0):
+    """
+    Return a `people` dictionary of `size` people: two founders,
+    the rest children of two earlier people, with some traits known.
+    """
+    rng = random.Random(seed)
+    people = {}
+    for i in range(size):
+        name = f"p{i}"
+        mother = father = None
+        if i >= 2:
+            mother, father = (f"p{k}" for k in rng.sample(range(i), 2))
+        people[name] = {"name": name, "mother": mother, "father": father,
+                        "trait": rng.choice((None, True, False))}
+    return people
+
+
+def link_corpus(pages, links, seed=0):
+    """
+    Return a `crawl`-style corpus of `pages` pages with up to `links`
+    links each, favouring low-numbered pages, some without any links.
+    """
+    rng = random.Random(seed)
+    corpus = {}
+    for i in range(pages):
+        count = 0 if rng.random() < 0.05 else rng.randint(1, links)
+        corpus[f"{i}.html"] = {
+            f"{min(pages - 1, int(rng.paretovariate(0.8)) - 1)}.html"
+            if rng.random() < 0.5 else f"{rng.randrange(pages)}.html"
+            for _ in range(count)
+        } - {f"{i}.html"}
+    return corpus
+
+
+def knights_puzzle(logic, people, seed=0):
+    """
+    Return `(knowledge, symbols)` for a random knights-and-knaves
+    puzzle where every person makes one statement about another.
+    """
+    rng = random.Random(seed)
+    knight = [logic.Symbol(f"P{i} is a Knight") for i in range(people)]
+    knave = [logic.Symbol(f"P{i} is a Knave") for i in range(people)]
+    knowledge = logic.And()
+    for i in range(people):
+        knowledge.add(logic.Or(knight[i], knave[i]))
+        knowledge.add(logic.Not(logic.And(knight[i], knave[i])))
+        j = rng.randrange(people)
+        claim = rng.choice((knight, knave))[j]
+        knowledge.add(logic.Implication(knight[i], claim))
+        knowledge.add(logic.Implication(knave[i], logic.Not(claim)))
+    return knowledge, knight + knave
+
+
+# Benchmarks: each takes a scale level and returns (run, counted)
+
+def bench_degrees(level):
+    import degrees
+    people = (2000, 5000, 20000)[level]
+    costar_graph(degrees, people, people // 2, 6)
+    pairs = costar_pairs(degrees, 5)
+
+    def run():
+        for source, target in pairs:
+            degrees.shortest_path(source, target)
+    return run, degrees.neighbors_for_person
+
+
+def bench_degrees_movie(level):
+    import degrees
+    people = (2000, 5000, 20000)[level]
+    costar_graph(degrees, people, people // 2, 6)
+    pairs = costar_pairs(degrees, 5)
+
+    def run():
+        for source, target in pairs:
+            degrees.shortest_path_by_movie(source, target)
+    return run, degrees.shortest_path_by_movie
+
+
+def bench_degrees_years(level):
+    import degrees
+    people = (2000, 5000, 20000)[level]
+    costar_graph(degrees, people, people // 2, 6)
+    pairs = costar_pairs(degrees, 5, years=(1990, 2010))
+
+    def run():
+        for source, target in pairs:
+            degrees.shortest_path_by_movie(source, target, years=(1990, 2010))
+    return run, degrees.movies_for_person
+
+
+def bench_tictactoe(level):
+    import tictactoe as ttt
+    board = tictactoe_board(ttt, (3, 1, 0)[level])
+
+    def run():
+        ttt.max_alpha_beta(board, -2, 2) if ttt.player(board) == ttt.X \
+            else ttt.min_alpha_beta(board, -2, 2)
+    return run, ttt.max_alpha_beta
+
+
+def bench_minesweeper(level):
+    import minesweeper
+    height, width, mines = ((8, 8, 10), (16, 16, 40), (24, 24, 99))[level]
+    random.seed(0)
+    game = minesweeper.Minesweeper(height, width, mines)
+    cells = [(i, j) for i in range(height) for j in range(width)
+             if not game.is_mine((i, j))]
+
+    def run():
+        ai = minesweeper.MinesweeperAI(height, width)
+        for cell in cells:
+            ai.add_knowledge(cell, game.nearby_mines(cell))
+    return run, minesweeper.Sentence.mark_safe
+
+
+def bench_minesweeper_reveal(level):
+    import minesweeper
+    height, width, mines = ((16, 16, 20), (32, 32, 80), (64, 64, 320))[level]
+    random.seed(0)
+    game = minesweeper.Minesweeper(height, width, mines)
+    zeros = [(i, j) for i in range(height) for j in range(width)
+             if not game.is_mine((i, j)) and game.nearby_mines((i, j)) == 0]
+
+    def run():
+        ai = minesweeper.MinesweeperAI(height, width)
+        for cell in zeros:
+            if cell not in ai.moves_made:
+                ai.add_knowledge_batch(game.reveal(cell))
+    return run, minesweeper.MinesweeperAI.infer_knowledge
+
+
+def bench_puzzle(level):
+    import logic
+    import puzzle
+    people = (3, 5, 7)[level]
+    puzzles = [puzzle.knowledge0, puzzle.knowledge1, puzzle.knowledge2,
+               puzzle.knowledge3]
+    knowledge, symbols = knights_puzzle(logic, people)
+
+    def run():
+        for kb in puzzles:
+            for symbol in (puzzle.AKnight, puzzle.AKnave, puzzle.BKnight,
+                           puzzle.BKnave, puzzle.CKnight, puzzle.CKnave):
+                logic.model_check(kb, symbol)
+        for symbol in symbols:
+            logic.model_check(knowledge, symbol)
+    return run, logic.Symbol.evaluate
+
+
+def bench_puzzle_bdd(level):
+    import logic
+    import puzzle
+    import puzzle_bdd
+    people = (3, 5, 7)[level]
+    puzzles = [puzzle.knowledge0, puzzle.knowledge1, puzzle.knowledge2,
+               puzzle.knowledge3]
+    symbols = [puzzle.AKnight, puzzle.AKnave, puzzle.BKnight,
+               puzzle.BKnave, puzzle.CKnight, puzzle.CKnave]
+    knowledge, generated = knights_puzzle(logic, people)
+
+    def run():
+        for kb, queries in [(kb, symbols) for kb in puzzles] + \
+                [(knowledge, generated)]:
+            bdd = puzzle_bdd.BDD(puzzle_bdd.variable_order(kb, queries))
+            root = bdd.compile(kb)
+            for symbol in queries:
+                bdd.entails(root, symbol)
+    return run, puzzle_bdd.BDD.node
+
+
+def bench_heredity(level):
+    import heredity
+    people = pedigree((3, 4, 5)[level])
+
+    def run():
+        heredity.exact_probabilities(people)
+    return run, heredity.joint_probability
+
+
+def bench_heredity_junction(level):
+    import heredity_junction
+    people = pedigree((3, 4, 5)[level])
+    position = {name: k for k, name in enumerate(people)}
+    tree = heredity_junction.JunctionTree([
+        (position.get(person["mother"], -1),
+         position.get(person["father"], -1))
+        for person in people.values()
+    ])
+    rng = random.Random(1)
+    evidence = [[rng.choice((None, True, False)) for _ in people]
+                for _ in range(100)]
+
+    def run():
+        for traits in evidence:
+            tree.query(traits)
+    return run, heredity_junction.JunctionTree.query
+
+
+def bench_heredity_sweep(level):
+    import heredity
+    import heredity_sweep
+    people = pedigree((3, 4, 5)[level])
+    family = heredity.Pedigree()
+    for name, person in people.items():
+        family.add(name, person["mother"], person["father"], person["trait"])
+    grid, settings = heredity_sweep.parameter_grid({
+        "mutation": [k / 100 for k in range(1, 11)],
+        "trait.2": [0.5 + k / 20 for k in range(10)]
+    })
+
+    def run():
+        heredity_sweep.sweep(family, grid)
+    return run, heredity.compile_model
+
+
+def bench_pagerank_iterate(level):
+    import pagerank
+    corpus = link_corpus((500, 5000, 50000)[level], 10)
+
+    def run():
+        pagerank.iterate_pagerank(corpus, pagerank.DAMPING)
+    return run, pagerank.rank_step
+
+
+def bench_pagerank_blocks(level):
+    import pagerank
+    corpus = link_corpus((500, 5000, 50000)[level], 10)
+
+    def run():
+        graph = pagerank.LinkGraph.from_corpus(corpus)
+        pagerank.block_pagerank(graph, pagerank.DAMPING)
+    return run, pagerank.strongly_connected_components
+
+
+def bench_pagerank_sample(level):
+    import pagerank
+    corpus = link_corpus((500, 5000, 50000)[level], 10)
+    samples = (10000, 100000, 1000000)[level]
+
+    def run():
+        random.seed(0)
+        pagerank.sample_pagerank(corpus, pagerank.DAMPING, samples)
+    return run, pagerank.sample_counts
+
+
+BENCHMARKS = {
+    "degrees": bench_degrees,
+    "degrees-movie": bench_degrees_movie,
+    "degrees-years": bench_degrees_years,
+    "tictactoe": bench_tictactoe,
+    "minesweeper": bench_minesweeper,
+    "minesweeper-reveal": bench_minesweeper_reveal,
+    "puzzle": bench_puzzle,
+    "puzzle-bdd": bench_puzzle_bdd,
+    "heredity": bench_heredity,
+    "heredity-junction": bench_heredity_junction,
+    "heredity-sweep": bench_heredity_sweep,
+    "pagerank-iterate": bench_pagerank_iterate,
+    "pagerank-blocks": bench_pagerank_blocks,
+    "pagerank-sample": bench_pagerank_sample,
+}
+
+
+if __name__ == "__main__":
+    main()